@@ -1,8 +1,9 @@
 import json
 import pandas as pd
 import numpy as np
-from scipy import stats
+from scipy import special
 from datetime import datetime
+from functools import lru_cache
 
 # --- Helper functions ---
 def safe_pct(current, best):
@@ -70,6 +71,40 @@ def calculate_z_scores(data_series):
         # Return safe defaults
         return [0.0] * len(data_series), 0.0, 0.0
 
+@lru_cache(maxsize=64)
+def _centred_periods(n):
+    """Read-only period indices 0..n-1 minus their mean, shared by every series of length n."""
+    x_centred = np.arange(n, dtype=float) - (n - 1) / 2.0
+    x_centred.flags.writeable = False
+    return x_centred
+
+def _linregress_periods(y_values):
+    """
+    Least-squares fit of values against their period index 0..n-1.
+    With evenly spaced integer x the slope has a closed form, so this gives the
+    same results as scipy.stats.linregress with a single centred dot product.
+    Returns slope, intercept, r value and two-sided p-value as floats.
+    """
+    n = len(y_values)
+    x_centred = _centred_periods(n)
+    ssxx = n * (n * n - 1) / 12.0
+    y_mean = float(y_values.mean())
+    y_centred = y_values - y_mean
+    
+    slope = float(x_centred @ y_values) / ssxx
+    intercept = y_mean - slope * (n - 1) / 2.0
+    ssyy = float(y_centred @ y_centred)
+    if ssyy == 0.0:
+        # Constant series: the pinned scipy's linregress reports r=0, p=1 (no trend)
+        return slope, intercept, 0.0, 1.0
+    
+    r_value = max(-1.0, min(1.0, slope * ssxx / np.sqrt(ssxx * ssyy)))
+    if abs(r_value) == 1.0:
+        return slope, intercept, r_value, 0.0
+    t_stat = r_value * np.sqrt((n - 2) / (1.0 - r_value * r_value))
+    p_value = float(2.0 * special.stdtr(n - 2, -abs(t_stat)))
+    return slope, intercept, r_value, p_value
+
 def calculate_trend(time_series_data, time_field='time_period', value_field='avgRepairTime_min'):
     """
     Calculate trend statistics for time series data.
@@ -81,18 +116,11 @@ def calculate_trend(time_series_data, time_field='time_period', value_field='avg
     # Sort by time period
     time_series_data = time_series_data.sort_values(by=time_field)
     
-    # Extract values as explicit numpy arrays of float type
-    x_values = np.arange(len(time_series_data), dtype=float)
+    # Extract values as an explicit numpy array of float type
     y_values = np.array(time_series_data[value_field].tolist(), dtype=float)
     
     # Calculate regression statistics
-    slope, intercept, r_value, p_value, std_err = stats.linregress(x_values, y_values)
-    
-    # Convert all values to float explicitly using numpy's item()
-    slope_float = float(slope.item())  # type: ignore
-    intercept_float = float(intercept.item())  # type: ignore
-    p_value_float = float(p_value.item())  # type: ignore
-    r_value_float = float(r_value.item())  # type: ignore
+    slope_float, intercept_float, r_value_float, p_value_float = _linregress_periods(y_values)
     
     # Calculate percentage change with explicit float operations
     if intercept_float > 0:
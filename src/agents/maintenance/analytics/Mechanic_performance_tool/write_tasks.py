@@ -92,7 +92,7 @@ class TaskWriter:
         details = finding.get('finding_details', {})
         
         # Check if task already exists for this finding
-        existing_check = self.supabase.table('tasks').select('id').eq('finding_id', finding_id).execute()
+        existing_check = self.supabase.table('tasks').select('id').eq('finding_id', finding_id).limit(1).execute()
         if existing_check.data:
             print(f"TASK_WRITER: Task already exists for finding ID {finding_id}")
             return None
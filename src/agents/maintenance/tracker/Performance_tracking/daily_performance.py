@@ -19,6 +19,11 @@ from shared_services.db_client import get_connection
 import firebase_admin
 from firebase_admin import credentials, firestore
 
+# View with each task's earliest measurement (definition in task_summary/readme), and
+# task IDs per IN (...) filter; one row per task keeps every response under max-rows
+BASELINE_VIEW = 'v_task_baselines'
+BASELINE_ID_BATCH_SIZE = 100
+
 class DailyPerformanceMeasurement:
     """
     Daily Performance Measurement Script
@@ -60,6 +65,29 @@ class DailyPerformanceMeasurement:
                      .execute())
         return res.data[0] if res.data else None
 
+    def get_baseline_measurements(self, task_ids):
+        """
+        Fetch the baseline (earliest) measurement of several tasks from the
+        v_task_baselines view, which holds one row per task
+
+        Args:
+            task_ids: IDs of the tasks to look up
+
+        Returns:
+            dict: Baseline row (task_id, value) keyed by task_id; tasks without
+            measurements are absent
+        """
+        task_ids = list(dict.fromkeys(t for t in task_ids if t is not None))
+        baselines = {}
+        for i in range(0, len(task_ids), BASELINE_ID_BATCH_SIZE):
+            res = (self.supabase.table(BASELINE_VIEW)
+                         .select('task_id,value')
+                         .in_('task_id', task_ids[i:i + BASELINE_ID_BATCH_SIZE])
+                         .execute())
+            for row in res.data or []:
+                baselines[row['task_id']] = row
+        return baselines
+
     def query_firebase_data(self, task):
         """Query Firestore using the numeric mechanic_id"""
         if not self.db:
@@ -121,9 +149,12 @@ class DailyPerformanceMeasurement:
         print(f"DAILY: ERROR creating measurement for task {task.get('id')}")
         return None
 
-    def process_task(self, task):
+    def process_task(self, task, baselines=None):
         print(f"DAILY: Processing task {task.get('id')}: {task.get('title')}")
-        base = self.get_baseline_measurement(task.get('id'))
+        if baselines is None:
+            base = self.get_baseline_measurement(task.get('id'))
+        else:
+            base = baselines.get(task.get('id'))
         if not base:
             print("DAILY: No baseline, skipping")
             return None
@@ -140,7 +171,9 @@ class DailyPerformanceMeasurement:
 
     def process_tasks(self, tasks):
         print(f"DAILY: Processing {len(tasks)} tasks")
-        results = [self.process_task(t) for t in tasks]
+        # One query for every task's baseline instead of one per task
+        baselines = self.get_baseline_measurements(t.get('id') for t in tasks)
+        results = [self.process_task(t, baselines) for t in tasks]
         print(f"DAILY: Completed with {sum(1 for r in results if r and r['status']=='measured')} measured")
         return results
 
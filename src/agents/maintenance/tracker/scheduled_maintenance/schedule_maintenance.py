@@ -1,15 +1,65 @@
 # /Users/melville/Documents/Industrial_Engineering_Agent/src/agents/maintenance/tracker/scheduled_maintenance/schedule_maintenance.py
 
+"""
+Maintenance scheduler: turns cluster analysis results into scheduled_maintenance tasks.
+
+The hot queries filter scheduled_maintenance on open tasks by assignee (workload
+balancing) and by machine_id (the batched existing-task check). Apply these partial indexes
+so they stay index scans as the table grows:
+
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_sm_status_assignee
+        ON scheduled_maintenance (status, assignee) WHERE status = 'open';
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_sm_status_machine
+        ON scheduled_maintenance (status, machine_id) WHERE status = 'open';
+
+Schedule generation looks up which machines already have an open task with one
+IN query before building tasks. Task creation relies on the unique index
+idx_sm_one_open_per_machine as the safety net: inserts for a machine that gained
+an open task in the meantime fail with a unique violation and are skipped. The
+index is created by supabase/migrations/20261017000000_sm_one_open_per_machine.sql,
+which must be applied before the scheduler runs:
+
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_sm_one_open_per_machine
+        ON scheduled_maintenance (machine_id) WHERE status = 'open';
+
+Inserts are plain INSERTs rather than upserts with on_conflict=machine_id: a partial
+index can only be an ON CONFLICT arbiter when the statement repeats its WHERE clause,
+which PostgREST cannot express, so the conflict is handled from the unique violation.
+
+The service schedule is ordered by the database through a generated priority
+rank (unknown priorities sort last), backed by an index on the open tasks:
+
+    ALTER TABLE scheduled_maintenance ADD COLUMN IF NOT EXISTS priority_rank smallint
+        GENERATED ALWAYS AS (CASE priority WHEN 'high' THEN 0 WHEN 'medium' THEN 1
+                                           WHEN 'low' THEN 2 ELSE 999 END) STORED;
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_sm_status_schedule
+        ON scheduled_maintenance (status, priority_rank, due_by) WHERE status = 'open';
+"""
+
 import uuid
+import heapq
+import queue
+import random
+import threading
+import time
 from datetime import datetime, timedelta
 import os
 import sys
 import json
 import logging
+from functools import lru_cache
+from operator import itemgetter
 from dotenv import load_dotenv
 from typing import List, Dict, Any, Optional, Tuple
-import pandas as pd
+import httpx
+import numpy as np
+from cachetools import TTLCache
 from supabase.client import create_client, Client
+
+try:
+    import ijson
+except ImportError:  # ijson is optional; cluster files are then loaded whole with json.load
+    ijson = None
 from supabase.__version__ import __version__ as supabase_version
 
 # Configure logging
@@ -24,15 +74,16 @@ sys.path.insert(0, src_dir)
 
 # Load environment variables from project root
 env_path = os.path.join(project_root, '.env.local')
-logger.info(f"Loading environment from: {env_path}")
-logger.info(f"File exists: {os.path.exists(env_path)}")
+logger.debug("Loading environment from: %s", env_path)
 load_dotenv(dotenv_path=env_path)
 
-# Get RAW_DATA_PATH from environment
-raw_data_path = os.getenv('RAW_DATA_PATH')
-logger.info(f"RAW_DATA_PATH from environment: {raw_data_path}")
-if raw_data_path:
-    logger.info(f"File exists: {os.path.exists(raw_data_path)}")
+from shared_services.concurrency import run_concurrently
+
+# Get RAW_DATA_PATH from environment once at import
+_RAW_DATA_PATH = os.getenv('RAW_DATA_PATH')
+_RAW_DATA_PATH_EXISTS = bool(_RAW_DATA_PATH and os.path.exists(_RAW_DATA_PATH))
+if _RAW_DATA_PATH:
+    logger.debug("RAW_DATA_PATH from environment: %s (exists: %s)", _RAW_DATA_PATH, _RAW_DATA_PATH_EXISTS)
 else:
     logger.warning("RAW_DATA_PATH not set in environment variables")
 
@@ -44,85 +95,186 @@ if not supabase_url or not supabase_key:
     logger.error("Supabase URL and key must be set in .env.local file")
     raise ValueError("Supabase URL and key must be set in .env.local file")
 
-supabase: Client = create_client(supabase_url, supabase_key)
+# Connection pool of the scheduler's PostgREST session. Idle connections are kept for
+# 30 seconds (httpx default: 5) so bursts of requests reuse them instead of new TLS
+# handshakes; keepalive slots cover MAX_CONCURRENT_QUERIES
+HTTP_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=30.0)
+
+@lru_cache(maxsize=1)
+def _get_client() -> Client:
+    """Create the Supabase client on first use; every scheduler in the process shares it."""
+    logger.debug("Creating Supabase client (version %s)", supabase_version)
+    client = create_client(supabase_url, supabase_key)
+    # Swap the PostgREST session for one with an explicit pool, keeping its URL, headers and timeout
+    session = client.postgrest.session
+    client.postgrest.session = type(session)(
+        base_url=session.base_url,
+        headers=session.headers,
+        timeout=session.timeout,
+        limits=HTTP_LIMITS,
+    )
+    session.close()
+    return client
+
+# Shared random source for workload tie-breaks
+_RNG = random.Random()
+
+# Ranking key of the machines in cluster analysis results
+_get_failure_count = itemgetter("failure_count")
+
+# Days until a task is due, by priority
+DUE_DAYS = {"high": 7, "medium": 14, "low": 14}
+
+# Server-side order of the service schedule: priority_rank (see module docstring), then due date
+SCHEDULE_ORDER = [("priority_rank", False), ("due_by", False)]
+
+# Background insert queue settings
+INSERT_BATCH_SIZE = 100         # Max rows per INSERT issued by the worker
+INSERT_FLUSH_INTERVAL = 0.05    # Seconds to wait for more rows before inserting a partial batch
+INSERT_QUEUE_MAXSIZE = 1000     # Producers block once this many rows are pending
+
+# Postgres error code raised by idx_sm_one_open_per_machine for a second open task
+UNIQUE_VIOLATION = '23505'
+
+# Machine IDs per IN (...) filter, keeps the request URL short
+MACHINE_ID_BATCH_SIZE = 100
+
+# Task IDs per IN (...) filter of a bulk update
+TASK_ID_BATCH_SIZE = 100
+
+# Max independent queries in flight at once during schedule generation
+MAX_CONCURRENT_QUERIES = 8
+
+# Seconds a get_tasks result is reused; writes through the scheduler clear the cache
+TASK_CACHE_TTL = 30
+
+def _run_concurrently(calls: List[Any]) -> List[Any]:
+    """
+    Run independent blocking calls (Supabase requests) in worker threads, at most
+    MAX_CONCURRENT_QUERIES at a time, and return their results in order.
+    """
+    return run_concurrently(calls, max_workers=MAX_CONCURRENT_QUERIES)
 
 class MaintenanceScheduler:
     def __init__(self):
-        logger.info("Initializing MaintenanceScheduler")
-        logger.info(f"SUPABASE_URL: {'Found' if supabase_url else 'Not found'}")
-        logger.info(f"SUPABASE_KEY: {'Found' if supabase_key else 'Not found'}")
-        logger.info(f"Supabase client version: {supabase_version}")
+        logger.debug("Initializing MaintenanceScheduler")
+        self.supabase = _get_client()
+        # Mechanics change rarely, so they are fetched once per scheduler run
+        self._mechanics_cache: Optional[List[Dict[str, Any]]] = None
+        # Random tie-breaks between equally loaded mechanics; replace with a seeded Random for reproducible runs
+        self._rng = _RNG
+        # Tasks queued for insertion by the background worker
+        self._insert_queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=INSERT_QUEUE_MAXSIZE)
+        self._insert_worker: Optional[threading.Thread] = None
+        self._insert_lock = threading.Lock()
+        self._failed_inserts: List[Dict[str, Any]] = []
+        self._skipped_inserts: List[Dict[str, Any]] = []
+        # get_tasks results keyed by their query arguments
+        self._task_cache: TTLCache = TTLCache(maxsize=64, ttl=TASK_CACHE_TTL)
+        self._task_cache_lock = threading.Lock()
     
     def ensure_tables_exist(self) -> bool:
         """Check if the required tables exist."""
         try:
-            result1 = supabase.table('scheduled_maintenance').select('count').limit(1).execute()
-            logger.info(f"scheduled_maintenance table exists, got result: {result1}")
-            result2 = supabase.table('mechanics').select('count').limit(1).execute()
-            logger.info(f"mechanics table exists, got result: {result2}")
+            result1 = self.supabase.table('scheduled_maintenance').select('count').limit(1).execute()
+            logger.debug("scheduled_maintenance table exists, got result: %r", result1)
+            result2 = self.supabase.table('mechanics').select('count').limit(1).execute()
+            logger.debug("mechanics table exists, got result: %r", result2)
             return True
         except Exception as e:
-            logger.error(f"Error checking tables: {e}")
+            logger.error("Error checking tables: %s", e)
             logger.error("Tables may not exist or there's an issue with permissions.")
             return False
     
-    def get_mechanics(self) -> List[Dict[str, Any]]:
-        """Get all mechanics."""
+    def get_mechanics(self, force: bool = False) -> List[Dict[str, Any]]:
+        """
+        Get all mechanics.
+        The result is cached on the scheduler; pass force=True to re-query the database.
+        """
+        if self._mechanics_cache is not None and not force:
+            return self._mechanics_cache
         try:
             logger.info("Attempting to fetch mechanics from database...")
-            result = supabase.table('mechanics').select('*').execute()
+            result = self.supabase.table('mechanics').select('employee_number,name,surname').execute()
             mechanics = result.data if result and hasattr(result, 'data') else []
-            logger.info(f"Retrieved {len(mechanics)} mechanics")
+            logger.info("Retrieved %d mechanics", len(mechanics))
+            # Precompute display names once rather than on every assignment
+            for mech in mechanics:
+                mech["full_name"] = f"{mech.get('name', '')} {mech.get('surname', '')}".strip()
             if mechanics:
-                for mech in mechanics:
-                    logger.info(f"Mechanic: {mech.get('name')} {mech.get('surname')} (#{mech.get('employee_number')})")
+                if logger.isEnabledFor(logging.DEBUG):
+                    for mech in mechanics:
+                        logger.debug("Mechanic: %s %s (#%s)", mech.get('name'), mech.get('surname'), mech.get('employee_number'))
             else:
                 logger.warning("No mechanics found. Please check the mechanics table in Supabase.")
+            self._mechanics_cache = mechanics
             return mechanics
         except Exception as e:
-            logger.error(f"Error fetching mechanics: {e}")
+            logger.error("Error fetching mechanics: %s", e)
             return []
     
-    def assign_mechanic(self) -> Tuple[str, str]:
+    def get_workloads(self, mechanics: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Count open tasks per mechanic with a single query.
+        Returns a dict of employee_number -> number of open tasks.
+        """
+        workloads = {m.get("employee_number"): 0 for m in mechanics}
+        try:
+            tasks_result = self.supabase.table('scheduled_maintenance') \
+                .select('assignee') \
+                .eq('status', 'open').execute()
+            open_tasks = tasks_result.data if tasks_result and hasattr(tasks_result, 'data') else []
+        except Exception as e:
+            logger.error("Error getting open tasks for workload balancing: %s", e)
+            open_tasks = []
+        for task in open_tasks:
+            assignee = task.get("assignee")
+            if assignee in workloads:
+                workloads[assignee] += 1
+        if logger.isEnabledFor(logging.INFO):
+            for mechanic in mechanics:
+                logger.info("Mechanic %s %s has %d open tasks",
+                            mechanic.get('name'), mechanic.get('surname'), workloads[mechanic.get('employee_number')])
+        return workloads
+    
+    def build_workload_heap(self, mechanics: List[Dict[str, Any]]) -> List[Tuple[int, float, str, str]]:
+        """
+        Build a min-heap of (workload, random_tiebreak, employee_number, full_name).
+        Mechanics with equal workload are picked in random order.
+        """
+        workloads = self.get_workloads(mechanics)
+        heap = []
+        for mechanic in mechanics:
+            employee_number = mechanic.get("employee_number", "unassigned")
+            heap.append((workloads.get(employee_number, 0), self._rng.random(), employee_number, mechanic["full_name"]))
+        heapq.heapify(heap)
+        return heap
+    
+    def assign_next_mechanic(self, heap: List[Tuple[int, float, str, str]]) -> Tuple[str, str]:
+        """
+        Pop the least loaded mechanic from the workload heap and push it back
+        with its workload incremented. Returns a tuple of (employee_number, full_name).
+        """
+        if not heap:
+            logger.warning("No mechanics found. Using 'unassigned' as fallback.")
+            return ("unassigned", "Unassigned")
+        workload, _, employee_number, full_name = heapq.heappop(heap)
+        heapq.heappush(heap, (workload + 1, self._rng.random(), employee_number, full_name))
+        logger.debug("Selected mechanic: %s (#%s)", full_name, employee_number)
+        return (employee_number, full_name)
+    
+    def assign_mechanic(self, mechanics: Optional[List[Dict[str, Any]]] = None) -> Tuple[str, str]:
         """
         Assign a mechanic using simple workload balancing.
+        Uses the supplied mechanics list if given, otherwise the cached one.
         Returns a tuple of (employee_number, full_name).
         """
         try:
-            mechanics = self.get_mechanics()
-            if not mechanics:
-                logger.warning("No mechanics found. Using 'unassigned' as fallback.")
-                return ("unassigned", "Unassigned")
-                
-            # Get current workload for each mechanic
-            for mechanic in mechanics:
-                try:
-                    tasks_result = supabase.table('scheduled_maintenance') \
-                        .select('*') \
-                        .eq('status', 'open') \
-                        .eq('assignee', mechanic.get("employee_number")).execute()
-                    open_tasks = tasks_result.data if tasks_result and hasattr(tasks_result, 'data') else []
-                except Exception as e:
-                    logger.error(f"Error getting tasks for mechanic {mechanic.get('employee_number')}: {e}")
-                    open_tasks = []
-                mechanic["current_workload"] = len(open_tasks)
-                logger.info(f"Mechanic {mechanic.get('name')} {mechanic.get('surname')} has {len(open_tasks)} open tasks")
-            
-            # Find mechanics with minimal workload
-            min_workload = min(mechanics, key=lambda m: m.get("current_workload", 0)).get("current_workload", 0)
-            mechanics_with_min_workload = [m for m in mechanics if m.get("current_workload", 0) == min_workload]
-            
-            # Randomly select from mechanics with minimal workload
-            import random
-            selected_mechanic = random.choice(mechanics_with_min_workload)
-            employee_number = selected_mechanic.get("employee_number", "unassigned")
-            name = selected_mechanic.get("name", "")
-            surname = selected_mechanic.get("surname", "")
-            full_name = f"{name} {surname}".strip()
-            logger.info(f"Selected mechanic: {full_name} (#{employee_number})")
-            return (employee_number, full_name)
+            if mechanics is None:
+                mechanics = self.get_mechanics()
+            return self.assign_next_mechanic(self.build_workload_heap(mechanics))
         except Exception as e:
-            logger.error(f"Error assigning mechanic: {e}", exc_info=True)
+            logger.error("Error assigning mechanic: %s", e, exc_info=True)
             logger.warning("Using 'unassigned' as fallback.")
             return ("unassigned", "Unassigned")
     
@@ -143,21 +295,83 @@ class MaintenanceScheduler:
          - machine_type: Type of the machine.
          - mechanic_name: Mechanic's full name.
         """
-        # Check if machine already has an open task
-        existing_tasks = self.get_tasks(status="open", machine_id=machine_id)
-        if existing_tasks:
-            logger.info(f"Machine {machine_id} already has an open maintenance task. Skipping.")
-            return existing_tasks[0]
+        task = self.build_task_record(
+            machine_id, machine_type, issue_type, description,
+            assignee, assignee_name, priority, due_days
+        )
         
-        # Set due date based on priority
-        if due_days is None:
-            due_days = 7 if priority == "high" else 14
+        logger.debug("Creating task for machine %s (type: %s) assigned to %s (%s)...",
+                     machine_id, machine_type, assignee_name, assignee)
+        try:
+            inserted, skipped = self.create_tasks_bulk([task])
+            if skipped:
+                # Machine already has an open task; return it as before. Bypass the cache:
+                # a result cached before the competing insert would still be empty
+                existing_tasks = self.get_tasks(status="open", machine_id=machine_id, use_cache=False)
+                return existing_tasks[0] if existing_tasks else None
+            logger.debug("Inserted task for machine %s", machine_id)
+            return inserted[0] if inserted else task
+        except Exception as e:
+            logger.error("Error inserting task: %s", e, exc_info=True)
+            logger.error("Could not insert task for machine %s", machine_id)
+            return None
+    
+    def create_tasks_bulk(self, tasks: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Insert task records in a single call, skipping machines that already have an open task.
+        Relies on idx_sm_one_open_per_machine rejecting duplicates with a unique violation.
+        Returns a tuple of (inserted_rows, skipped_tasks); other database errors are raised.
+        """
+        if not tasks:
+            return [], []
+        try:
+            result = self.supabase.table('scheduled_maintenance').insert(tasks).execute()
+            self.invalidate_task_cache()
+            return (result.data if result and hasattr(result, 'data') and result.data else []), []
+        except Exception as e:
+            if getattr(e, 'code', None) != UNIQUE_VIOLATION:
+                raise
+            if len(tasks) == 1:
+                logger.info("Machine %s already has an open maintenance task. Skipping.", tasks[0]["machine_id"])
+                return [], list(tasks)
         
-        now = datetime.now()
-        due_date = now + timedelta(days=due_days)
+        # A single conflicting row rejects the whole batch, so retry row by row
+        inserted, skipped = [], []
+        for task in tasks:
+            rows, duplicates = self.create_tasks_bulk([task])
+            inserted.extend(rows)
+            skipped.extend(duplicates)
+        return inserted, skipped
+    
+    def build_task_record(
+        self,
+        machine_id: str,
+        machine_type: str,
+        issue_type: str,
+        description: str,
+        assignee: str,
+        assignee_name: str,
+        priority: str = "medium",
+        due_days: Optional[int] = None,
+        due_by: Optional[str] = None,
+        created_at: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Build a maintenance task record without writing it to the database.
+        Batch callers can pass precomputed due_by/created_at ISO strings to skip the date arithmetic.
+        """
+        if due_by is None or created_at is None:
+            now = datetime.now()
+            if created_at is None:
+                created_at = now.isoformat()
+            if due_by is None:
+                # Set due date based on priority
+                if due_days is None:
+                    due_days = DUE_DAYS.get(priority, DUE_DAYS["medium"])
+                due_by = (now + timedelta(days=due_days)).isoformat()
         
         # Build task record with extra fields
-        task = {
+        return {
             "machine_id": machine_id,
             "machine_type": machine_type,     # Type of machine
             "issue_type": issue_type,
@@ -166,46 +380,162 @@ class MaintenanceScheduler:
             "mechanic_name": assignee_name,   # Mechanic's full name
             "priority": priority,
             "status": "open",
-            "due_by": due_date.isoformat(),
-            "created_at": now.isoformat(),
+            "due_by": due_by,
+            "created_at": created_at,
         }
+    
+    def schedule_task_async(self, task: Dict[str, Any]) -> None:
+        """
+        Queue a task record for insertion by the background worker and return immediately.
+        Blocks only when INSERT_QUEUE_MAXSIZE rows are already pending.
+        Once inserted, the task dict is updated in place with the stored row.
+        """
+        with self._insert_lock:
+            if self._insert_worker is None or not self._insert_worker.is_alive():
+                self._insert_worker = threading.Thread(
+                    target=self._flush_worker, name="maintenance-insert-worker", daemon=True
+                )
+                self._insert_worker.start()
+        self._insert_queue.put(task)
+    
+    def flush(self) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Wait until every queued task has been written.
+        Returns a tuple of (failed_tasks, skipped_tasks) since the last flush, where
+        skipped tasks belong to machines that already had an open task.
+        """
+        self._insert_queue.join()
+        with self._insert_lock:
+            failed, self._failed_inserts = self._failed_inserts, []
+            skipped, self._skipped_inserts = self._skipped_inserts, []
+        return failed, skipped
+    
+    def _flush_worker(self) -> None:
+        """Drain the insert queue in batches of up to INSERT_BATCH_SIZE rows."""
+        while True:
+            batch = [self._insert_queue.get()]
+            deadline = time.monotonic() + INSERT_FLUSH_INTERVAL
+            while len(batch) < INSERT_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._insert_queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                rows, skipped = self.create_tasks_bulk(batch)
+                self._apply_inserted_rows(batch, rows, skipped)
+                if skipped:
+                    with self._insert_lock:
+                        self._skipped_inserts.extend(skipped)
+                logger.info("Inserted %d queued tasks, skipped %d", len(batch) - len(skipped), len(skipped))
+            except Exception as e:
+                logger.error("Error inserting %d queued tasks: %s", len(batch), e, exc_info=True)
+                with self._insert_lock:
+                    self._failed_inserts.extend(batch)
+            finally:
+                for _ in batch:
+                    self._insert_queue.task_done()
+    
+    @staticmethod
+    def _apply_inserted_rows(tasks: List[Dict[str, Any]], rows: List[Dict[str, Any]],
+                             skipped: List[Dict[str, Any]]) -> None:
+        """Update inserted task dicts in place with their stored rows (which add 'id')."""
+        skipped_ids = {id(task) for task in skipped}
+        for task, row in zip((t for t in tasks if id(t) not in skipped_ids), rows):
+            task.update(row)
+    
+    def _stamp_update(self, updates: Dict[str, Any], now: str) -> Dict[str, Any]:
+        """Return the fields to write for one task update, with updated_at (and completed_at when completing) set."""
+        payload = {key: value for key, value in updates.items() if key != "id"}
+        payload["updated_at"] = now
+        if payload.get("status") == "completed":
+            payload["completed_at"] = now
+        return payload
+    
+    def update_tasks_bulk(self, updates: List[Dict[str, Any]], now_iso: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Update several existing tasks with one UPDATE ... WHERE id IN (...) per distinct change.
+        Each entry must carry the task 'id' plus the fields to change; tasks receiving the same
+        fields and values are updated together. Unknown ids are ignored, nothing is inserted.
+        now_iso is the updated_at/completed_at timestamp; pass one to share it across calls in a run.
+        Returns the updated task rows. Each request commits on its own, so a failed request is
+        logged with its task ids and the rows written by the others are still returned.
+        """
+        if not updates:
+            return []
+        now = now_iso or datetime.now().isoformat()
+        
+        # Group task ids by their payload; values may be unhashable, so key on their JSON form
+        groups: Dict[str, Tuple[Dict[str, Any], List[Any]]] = {}
+        for update in updates:
+            payload = self._stamp_update(update, now)
+            key = json.dumps(payload, sort_keys=True, default=str)
+            groups.setdefault(key, (payload, []))[1].append(update["id"])
+        
+        failed_ids: List[Any] = []
         
-        logger.info(f"Creating task for machine {machine_id} (type: {machine_type}) assigned to {assignee_name} ({assignee})...")
+        def update_batch(payload: Dict[str, Any], task_ids: List[Any]) -> List[Dict[str, Any]]:
+            try:
+                result = self.supabase.table('scheduled_maintenance').update(payload).in_('id', task_ids).execute()
+            except Exception as e:
+                logger.error("Error updating tasks %s: %s", task_ids, e, exc_info=True)
+                failed_ids.extend(task_ids)
+                return []
+            return result.data if result and hasattr(result, 'data') and result.data else []
+        
+        calls = [lambda payload=payload, batch=task_ids[i:i + TASK_ID_BATCH_SIZE]: update_batch(payload, batch)
+                 for payload, task_ids in groups.values()
+                 for i in range(0, len(task_ids), TASK_ID_BATCH_SIZE)]
         try:
-            result = supabase.table('scheduled_maintenance').insert(task).execute()
-            logger.info("Task inserted successfully")
-            return result.data[0] if result and hasattr(result, 'data') and result.data else task
-        except Exception as e:
-            logger.error(f"Error inserting task: {e}", exc_info=True)
-            logger.error(f"Could not insert task for machine {machine_id}")
-            return None
+            updated = [row for rows in _run_concurrently(calls) for row in rows]
+        finally:
+            self.invalidate_task_cache()
+        if failed_ids:
+            logger.warning("Failed to update %d of %d tasks", len(failed_ids), len(updates))
+        logger.info("Updated %d of %d tasks in %d requests", len(updated), len(updates), len(calls))
+        return updated
     
-    def update_task(self, task_id: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Update an existing task."""
-        updates["updated_at"] = datetime.now().isoformat()
-        if "status" in updates and updates["status"] == "completed":
-            updates["completed_at"] = datetime.now().isoformat()
+    def update_task(self, task_id: str, updates: Dict[str, Any], now_iso: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Update an existing task; now_iso is the updated_at/completed_at timestamp (default: now)."""
+        payload = self._stamp_update(updates, now_iso or datetime.now().isoformat())
         try:
-            result = supabase.table('scheduled_maintenance').update(updates).eq('id', task_id).execute()
-            if result and hasattr(result, 'data') and result.data:
-                logger.info(f"Task {task_id} updated successfully")
-                return result.data[0]
-            else:
-                logger.warning(f"Task {task_id} update returned no data")
-                return None
+            result = self.supabase.table('scheduled_maintenance').update(payload).eq('id', task_id).execute()
+            self.invalidate_task_cache()
         except Exception as e:
-            logger.error(f"Error updating task {task_id}: {e}", exc_info=True)
+            logger.error("Error updating task %s: %s", task_id, e, exc_info=True)
             return None
+        if result and hasattr(result, 'data') and result.data:
+            logger.debug("Task %s updated successfully", task_id)
+            return result.data[0]
+        logger.warning("Task %s update returned no data", task_id)
+        return None
     
     def get_tasks(
         self,
         status: Optional[str] = None,
         assignee: Optional[str] = None,
-        machine_id: Optional[str] = None
+        machine_id: Optional[str] = None,
+        fields: str = '*',
+        use_cache: bool = True,
+        order: Optional[List[Tuple[str, bool]]] = None,
+        limit: Optional[int] = None
     ) -> List[Dict[str, Any]]:
-        """Get tasks with optional filtering."""
+        """
+        Get tasks with optional filtering.
+        fields is a comma-separated column list; narrow it when only a few columns are needed.
+        order is a list of (column, descending) pairs applied by the database, limit caps the rows returned.
+        Results are reused for TASK_CACHE_TTL seconds; pass use_cache=False to re-query the database.
+        """
+        key = (status, assignee, machine_id, fields, tuple(order or ()), limit)
+        if use_cache:
+            with self._task_cache_lock:
+                cached = self._task_cache.get(key)
+            if cached is not None:
+                return list(cached)
         try:
-            query = supabase.table('scheduled_maintenance').select('*')
+            query = self.supabase.table('scheduled_maintenance').select(fields)
             filters = []
             
             if status:
@@ -219,58 +549,137 @@ class MaintenanceScheduler:
             if machine_id:
                 query = query.eq('machine_id', machine_id)
                 filters.append(f"machine_id={machine_id}")
+            
+            for column, desc in order or ():
+                query = query.order(column, desc=desc)
+            if limit is not None:
+                query = query.limit(limit)
                 
-            filter_str = " AND ".join(filters) if filters else "no filters"
-            logger.info(f"Getting tasks with {filter_str}")
+            logger.info("Getting tasks with %s", " AND ".join(filters) if filters else "no filters")
             
             result = query.execute()
             tasks = result.data if result and hasattr(result, 'data') else []
-            logger.info(f"Retrieved {len(tasks)} tasks")
-            return tasks
+            logger.info("Retrieved %d tasks", len(tasks))
+            with self._task_cache_lock:
+                self._task_cache[key] = tasks
+            return list(tasks)
         except Exception as e:
-            logger.error(f"Error in get_tasks: {e}", exc_info=True)
+            logger.error("Error in get_tasks: %s", e, exc_info=True)
             return []
     
+    def get_open_machine_ids(self, machine_ids: List[str]) -> set:
+        """
+        Return the subset of machine_ids that already have an open task,
+        using one IN query per MACHINE_ID_BATCH_SIZE machines; the batches run concurrently.
+        """
+        machine_ids = list(machine_ids)
+        batches = [machine_ids[i:i + MACHINE_ID_BATCH_SIZE] for i in range(0, len(machine_ids), MACHINE_ID_BATCH_SIZE)]
+        
+        def select_batch(batch):
+            result = self.supabase.table('scheduled_maintenance') \
+                .select('machine_id') \
+                .eq('status', 'open') \
+                .in_('machine_id', batch).execute()
+            rows = result.data if result and hasattr(result, 'data') else []
+            return [row['machine_id'] for row in rows]
+        
+        open_machine_ids = set()
+        try:
+            if len(batches) == 1:
+                open_machine_ids.update(select_batch(batches[0]))
+            elif batches:
+                for batch_ids in _run_concurrently([lambda b=batch: select_batch(b) for batch in batches]):
+                    open_machine_ids.update(batch_ids)
+        except Exception as e:
+            # The unique index still rejects duplicates at insert time
+            logger.error("Error checking machines for open tasks: %s", e)
+        return open_machine_ids
+    
+    def invalidate_task_cache(self) -> None:
+        """Drop cached get_tasks results, e.g. after tasks were written outside the scheduler."""
+        with self._task_cache_lock:
+            self._task_cache.clear()
+    
     def list_all_tasks(self) -> List[Dict[str, Any]]:
         """List all tasks in the database."""
         try:
-            result = supabase.table('scheduled_maintenance').select('*').execute()
+            result = self.supabase.table('scheduled_maintenance').select('*').execute()
             tasks = result.data if result and hasattr(result, 'data') else []
-            logger.info(f"Found {len(tasks)} tasks in database")
+            logger.info("Found %d tasks in database", len(tasks))
             
-            for task in tasks:
-                logger.info(f"Task: Machine {task.get('machine_id')} - {task.get('description')} - Assigned to: {task.get('assignee')}")
+            if logger.isEnabledFor(logging.DEBUG):
+                for task in tasks:
+                    logger.debug("Task: Machine %s - %s - Assigned to: %s",
+                                 task.get('machine_id'), task.get('description'), task.get('assignee'))
                 
             return tasks
         except Exception as e:
-            logger.error(f"Error listing tasks: {e}", exc_info=True)
+            logger.error("Error listing tasks: %s", e, exc_info=True)
             return []
     
-    def generate_service_schedule_from_cluster(self, cluster_file, max_tasks=None):
+    def generate_service_schedule_from_cluster(self, cluster_file=None, max_tasks=None, cluster_data=None):
         """
         Generate a service schedule based on cluster analysis results.
+        Pass cluster_data (the parsed analysis results) to avoid re-reading cluster_file from disk.
         Uses the 80/20 rule to determine priority.
         """
-        # Validate cluster file
-        logger.info(f"Loading cluster file from: {cluster_file}")
-        if not os.path.exists(cluster_file):
-            logger.error(f"Cluster file not found: {cluster_file}")
-            return {"error": f"Cluster file not found: {cluster_file}"}
+        if cluster_data is None:
+            if not cluster_file:
+                logger.error("No cluster file or cluster data provided")
+                return {"error": "Either cluster_file or cluster_data must be provided"}
             
-        try:
+            # Validate cluster file
+            logger.info("Loading cluster file from: %s", cluster_file)
+            if not os.path.exists(cluster_file):
+                logger.error("Cluster file not found: %s", cluster_file)
+                return {"error": f"Cluster file not found: {cluster_file}"}
+            
+            try:
+                cluster_data = self._load_cluster_file(cluster_file)
+            except Exception as e:
+                logger.error("Error loading cluster file: %s", e, exc_info=True)
+                return {"error": str(e)}
+        
+        return self._generate_from_dict(cluster_data, max_tasks)
+    
+    def _load_cluster_file(self, cluster_file: str) -> Dict[str, Any]:
+        """
+        Read a cluster analysis file for schedule generation.
+        With ijson, aggregated_data is streamed and only the cluster 1 machines are kept,
+        so memory grows with the problematic machines rather than the file. All of them are
+        kept because the 80/20 priority split needs the failure counts of every one.
+        Returns {"aggregated_data": [...]}, or an empty dict if the file has no aggregated_data.
+        """
+        if ijson is None:
             with open(cluster_file, 'r') as f:
-                cluster_data = json.load(f)
-                
+                return json.load(f)
+        
+        found = False
+        
+        def events(f):
+            nonlocal found
+            for prefix, event, value in ijson.parse(f, use_float=True):
+                if prefix == 'aggregated_data' and event == 'start_array':
+                    found = True
+                yield prefix, event, value
+        
+        with open(cluster_file, 'rb') as f:
+            bad = [m for m in ijson.items(events(f), 'aggregated_data.item') if m.get('cluster') == 1]
+        return {"aggregated_data": bad} if found else {}
+    
+    def _generate_from_dict(self, cluster_data: Dict[str, Any], max_tasks=None) -> Dict[str, Any]:
+        """Generate a service schedule from parsed cluster analysis results."""
+        try:
             # Validate expected structure
             if "aggregated_data" not in cluster_data:
                 logger.error("Invalid cluster data format: 'aggregated_data' key not found")
                 return {"error": "Invalid cluster data format"}
                 
             # Get machines in bad cluster (cluster 1)
-            bad_machines = [m for m in cluster_data["aggregated_data"] if m["cluster"] == 1]
-            logger.info(f"Found {len(bad_machines)} machines in the problematic cluster")
+            bad = [m for m in cluster_data["aggregated_data"] if m.get("cluster") == 1]
+            logger.info("Found %d machines in the problematic cluster", len(bad))
             
-            if not bad_machines:
+            if not bad:
                 logger.info("No problematic machines found in cluster analysis")
                 return {
                     "created": [],
@@ -281,112 +690,127 @@ class MaintenanceScheduler:
                     "tasks_created": 0
                 }
             
-            # Sort by failure count (most failures first)
-            bad_machines.sort(key=lambda x: x["failure_count"], reverse=True)
-            
-            # Calculate priority using 80/20 rule (Pareto principle)
-            total_failures = sum(m["failure_count"] for m in bad_machines)
-            running_sum = 0
-            high_priority_machines = []
-            medium_priority_machines = []
+            # Calculate priority using 80/20 rule (Pareto principle): ranked by failure count, machines
+            # whose cumulative count stays within 80% of the total are high priority. Only the counts
+            # need a full sort; the high priority machines are a prefix of the ranking
+            counts = np.fromiter(map(_get_failure_count, bad), dtype=np.float64, count=len(bad))
+            cumulative = np.cumsum(np.sort(counts)[::-1])
+            threshold = 0.8 * cumulative[-1]
+            high_priority_count = int(np.searchsorted(cumulative, threshold, side="right"))
+            medium_priority_count = len(bad) - high_priority_count
             
-            for machine in bad_machines:
-                running_sum += machine["failure_count"]
-                percentage_contribution = running_sum / total_failures
-                if percentage_contribution <= 0.8:
-                    high_priority_machines.append(machine)
-                else:
-                    medium_priority_machines.append(machine)
-            
-            logger.info(f"Identified {len(high_priority_machines)} high priority and {len(medium_priority_machines)} medium priority machines")
+            logger.info("Identified %d high priority and %d medium priority machines",
+                        high_priority_count, medium_priority_count)
             
-            # Combine with priority information
-            machines_to_service = []
-            for machine in high_priority_machines:
-                machines_to_service.append({**machine, "priority": "high"})
-            for machine in medium_priority_machines:
-                machines_to_service.append({**machine, "priority": "medium"})
-            
-            # Limit by max_tasks if specified
+            # Rank machines by failure count (most failures first, ties in input order),
+            # selecting only the top max_tasks if specified
             if max_tasks and max_tasks > 0:
-                original_count = len(machines_to_service)
-                machines_to_service = machines_to_service[:max_tasks]
-                logger.info(f"Limiting to {max_tasks} tasks from {original_count} identified machines")
+                logger.info("Limiting to %d tasks from %d identified machines", max_tasks, len(bad))
+                ranked = heapq.nlargest(max_tasks, bad, key=_get_failure_count)
+            else:
+                ranked = sorted(bad, key=_get_failure_count, reverse=True)
+            machines_to_service = [
+                {**machine, "priority": "high" if rank < high_priority_count else "medium"}
+                for rank, machine in enumerate(ranked)
+            ]
             
-            # Create tasks for each machine
-            tasks_created = []
+            # Find machines that already have an open task with one query, so they
+            # are neither assigned a mechanic nor sent to the database
+            # Mechanics and their open workload are fetched once for the whole run, alongside that check
+            open_machine_ids, workload_heap = _run_concurrently([
+                lambda: self.get_open_machine_ids([m["machineNumber"] for m in machines_to_service]),
+                lambda: self.build_workload_heap(self.get_mechanics()),
+            ])
+            
+            # Build a task for each remaining machine; they are inserted together below
+            new_tasks = []
             skipped_machines = []
+            issue_type = "preventative_maintenance"
+            assign_next_mechanic = self.assign_next_mechanic
+            
+            # All tasks in this run share the same creation time, so due dates are computed once per priority
+            now = datetime.now()
+            created_at = now.isoformat()
+            due_by = {p: (now + timedelta(days=d)).isoformat() for p, d in DUE_DAYS.items()}
             
             for machine in machines_to_service:
                 machine_id = machine["machineNumber"]
                 machine_type = machine.get("machine_type", "Unknown")
+                priority = machine["priority"]
                 
-                # Check if machine already has open tasks
-                existing_tasks = self.get_tasks(status="open", machine_id=machine_id)
-                if existing_tasks:
-                    logger.info(f"Machine {machine_id} already has an open task. Skipping.")
+                if machine_id in open_machine_ids:
+                    logger.debug("Machine %s already has an open task. Skipping.", machine_id)
                     skipped_machines.append(machine_id)
                     continue
                 
                 # Assign mechanic using workload balancing algorithm
-                assignee, assignee_name = self.assign_mechanic()
+                assignee, assignee_name = assign_next_mechanic(workload_heap)
                 
-                # Create the maintenance task
-                task = self.create_task(
+                # Build the maintenance task
+                task = self.build_task_record(
                     machine_id=machine_id,
                     machine_type=machine_type,
-                    issue_type="preventative_maintenance",
-                    description=(
-                        f"Schedule maintenance for {machine_type} (#{machine_id}) - "
-                        f"Identified in high failure cluster with {machine['failure_count']} failures"
-                    ),
+                    issue_type=issue_type,
+                    description=f"Schedule maintenance for {machine_type} (#{machine_id}) - Identified in high failure cluster with {machine['failure_count']} failures",
                     assignee=assignee,
                     assignee_name=assignee_name,
-                    priority=machine["priority"],
-                    due_days=7 if machine["priority"] == "high" else 14
+                    priority=priority,
+                    due_by=due_by[priority],
+                    created_at=created_at
                 )
-                
-                if task:
+                new_tasks.append(task)
+            
+            # Insert every task with one call; machines that gained an open task
+            # since the check are skipped on conflict
+            try:
+                rows, skipped = self.create_tasks_bulk(new_tasks)
+                self._apply_inserted_rows(new_tasks, rows, skipped)
+                insert_failed = False
+            except Exception as e:
+                logger.error("Error inserting %d tasks: %s", len(new_tasks), e, exc_info=True)
+                skipped, insert_failed = [], True
+            skipped_ids = {id(task) for task in skipped}
+            tasks_created = []
+            for task in new_tasks:
+                if id(task) in skipped_ids:
+                    logger.debug("Machine %s already has an open task. Skipping.", task["machine_id"])
+                    skipped_machines.append(task["machine_id"])
+                elif insert_failed:
+                    logger.error("Could not insert task for machine %s", task["machine_id"])
+                else:
                     tasks_created.append(task)
-                    logger.info(f"Created {machine['priority']} priority task for machine {machine_id}")
+                    logger.debug("Created %s priority task for machine %s", task['priority'], task['machine_id'])
             
             # Return summary of the scheduling operation
             result = {
                 "created": tasks_created,
                 "skipped": skipped_machines,
-                "total_problematic_machines": len(bad_machines),
-                "high_priority_count": len(high_priority_machines),
-                "medium_priority_count": len(medium_priority_machines),
+                "total_problematic_machines": len(bad),
+                "high_priority_count": high_priority_count,
+                "medium_priority_count": medium_priority_count,
                 "tasks_created": len(tasks_created)
             }
             
-            logger.info(f"Service schedule generation complete. Created {len(tasks_created)} tasks, skipped {len(skipped_machines)} machines.")
+            logger.info("Service schedule generation complete. Created %d tasks, skipped %d machines.",
+                        len(tasks_created), len(skipped_machines))
             return result
             
         except Exception as e:
-            logger.error(f"Error generating service schedule: {e}", exc_info=True)
+            logger.error("Error generating service schedule: %s", e, exc_info=True)
             return {"error": str(e)}
     
-    def get_service_schedule(self, status="open"):
-        """Get the current service schedule."""
+    def get_service_schedule(self, status="open", top_k: Optional[int] = None):
+        """
+        Get the current service schedule, ordered by priority and due date.
+        Pass top_k to get only the first top_k tasks of the schedule.
+        """
         try:
-            tasks = self.get_tasks(status=status)
-            logger.info(f"Retrieved {len(tasks)} {status} tasks")
-            
-            # Sort by priority and due date
-            priority_order = {"high": 0, "medium": 1, "low": 2}
-            sorted_tasks = tasks.copy() if tasks else []
-            
-            if sorted_tasks:
-                sorted_tasks.sort(key=lambda t: (
-                    priority_order.get(t.get("priority", "medium"), 999),
-                    t.get("due_by", "")
-                ))
-                logger.info("Tasks sorted by priority and due date")
-                
-            return sorted_tasks
+            # Sorted and limited by the database, so only the rows needed are transferred
+            tasks = self.get_tasks(status=status, order=SCHEDULE_ORDER, limit=top_k)
+            logger.info("Retrieved %d %s tasks", len(tasks), status)
+            return tasks
         except Exception as e:
-            logger.error(f"Error getting service schedule: {e}", exc_info=True)
+            logger.error("Error getting service schedule: %s", e, exc_info=True)
             return []
 
 
@@ -411,13 +835,13 @@ if __name__ == "__main__":
         logger.info(f"Found {len(tasks)} existing tasks")
         
         # Check for RAW_DATA_PATH
-        raw_data_path = os.getenv('RAW_DATA_PATH')
+        raw_data_path = _RAW_DATA_PATH
         if not raw_data_path:
             logger.error("RAW_DATA_PATH environment variable not set")
             logger.info("Please set RAW_DATA_PATH in your .env.local file")
             sys.exit(1)
             
-        if not os.path.exists(raw_data_path):
+        if not _RAW_DATA_PATH_EXISTS:
             logger.error(f"File not found at RAW_DATA_PATH: {raw_data_path}")
             logger.info("Please ensure the file exists at the specified path")
             sys.exit(1)
@@ -426,6 +850,7 @@ if __name__ == "__main__":
         
         # Generate or use existing cluster file
         cluster_file = os.path.join(src_dir, "cluster.json")
+        analysis_results = None
         
         # If cluster file doesn't exist, create it
         if not os.path.exists(cluster_file):
@@ -444,7 +869,7 @@ if __name__ == "__main__":
                 analysis_results = run_analysis(maintenance_records)
                 logger.info("Analysis completed successfully")
                 
-                # Save results
+                # Save results for later runs
                 with open(cluster_file, 'w') as f:
                     json.dump(analysis_results, f, indent=2)
                 logger.info(f"Saved cluster analysis to {cluster_file}")
@@ -455,10 +880,15 @@ if __name__ == "__main__":
         else:
             logger.info(f"Using existing cluster file: {cluster_file}")
         
-        # Generate service schedule if cluster file exists
-        if os.path.exists(cluster_file):
-            logger.info(f"Generating service schedule from {cluster_file}")
-            result = scheduler.generate_service_schedule_from_cluster(cluster_file=cluster_file, max_tasks=10)
+        # Generate service schedule from fresh results, or from the cluster file if it exists
+        if analysis_results is not None or os.path.exists(cluster_file):
+            if analysis_results is not None:
+                logger.info("Generating service schedule from fresh analysis results")
+            else:
+                logger.info(f"Generating service schedule from {cluster_file}")
+            result = scheduler.generate_service_schedule_from_cluster(
+                cluster_file=cluster_file, max_tasks=10, cluster_data=analysis_results
+            )
             
             if "error" in result:
                 logger.error(f"Error in schedule generation: {result['error']}")
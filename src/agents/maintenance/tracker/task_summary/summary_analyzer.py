@@ -1,9 +1,35 @@
 #!/usr/bin/env python3
 import sys
 import os
-from datetime import datetime
+import logging
+import hashlib
+import struct
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import asdict, dataclass, fields, replace
+from datetime import datetime, timezone
+import math
+import warnings
+from functools import lru_cache
+from operator import itemgetter
 import numpy as np
-from scipy import stats
+# scipy is imported inside the functions that use it: scipy.special adds about 0.25 s to
+# importing this module and scipy.signal (FFT rolling means only) about 1 s
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the kernels below then run as plain Python
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+try:
+    import xxhash
+except ImportError:  # xxhash is optional; summary cache keys then use blake2b
+    xxhash = None
+
+logger = logging.getLogger("summary_analyzer")
 
 # Add project root to path
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -11,6 +37,418 @@ src_dir = os.path.abspath(os.path.join(current_dir, "../../../"))
 if src_dir not in sys.path:
     sys.path.insert(0, src_dir)
 
+# Window length from which rolling means use FFT convolution instead of direct convolution
+FFT_WINDOW_THRESHOLD = 64
+
+# Number of summaries SummaryAnalyzer keeps for unchanged measurement data
+SUMMARY_CACHE_SIZE = 256
+
+# Two-sided p-value below which a trend is reported as significant
+TREND_P_THRESHOLD = 0.05
+
+# Reads the value of a measurement record
+_get_value = itemgetter('value')
+
+
+@lru_cache(maxsize=256)
+def _critical_t(df):
+    """Smallest |t| with a two-sided p-value at or below TREND_P_THRESHOLD for df degrees of freedom"""
+    from scipy import special
+    return float(special.stdtrit(df, 1.0 - TREND_P_THRESHOLD / 2.0))
+
+
+@njit(cache=True)
+def _linreg_core(x, y):
+    """
+    Least-squares statistics for a single series
+    
+    Args:
+        x: float64 array of timestamps
+        y: float64 array of values
+        
+    Returns:
+        tuple: (ssxx, slope, r_squared, t_stat); slope is NaN when all x are identical,
+               r_squared and t_stat are 0 when y is constant (as the pinned scipy's
+               linregress: r=0, p=1), t_stat is inf for a perfect fit
+    """
+    n = x.shape[0]
+    mean_x = 0.0
+    mean_y = 0.0
+    for i in range(n):
+        mean_x += x[i]
+        mean_y += y[i]
+    mean_x /= n
+    mean_y /= n
+    
+    ssxx = 0.0
+    ssxy = 0.0
+    ssyy = 0.0
+    for i in range(n):
+        dx = x[i] - mean_x
+        dy = y[i] - mean_y
+        ssxx += dx * dx
+        ssxy += dx * dy
+        ssyy += dy * dy
+    
+    if ssxx == 0.0:
+        return ssxx, math.nan, math.nan, math.nan
+    slope = ssxy / ssxx
+    if ssyy == 0.0:
+        return ssxx, slope, 0.0, 0.0
+    r_squared = min((ssxy * ssxy) / (ssxx * ssyy), 1.0)
+    if r_squared >= 1.0:
+        return ssxx, slope, r_squared, math.inf
+    return ssxx, slope, r_squared, math.sqrt(r_squared * (n - 2) / (1.0 - r_squared))
+
+
+@njit(cache=True)
+def _ttest_core(a, b):
+    """
+    Two-sample t statistic with pooled variance (as scipy.stats.ttest_ind)
+    
+    Args:
+        a: float64 array, first sample
+        b: float64 array, second sample
+        
+    Returns:
+        tuple: (t_stat, degrees_of_freedom); t_stat is NaN when both samples are
+               constant and equal, and +/-inf when they are constant and differ
+    """
+    n1 = a.shape[0]
+    n2 = b.shape[0]
+    m1 = 0.0
+    m2 = 0.0
+    for i in range(n1):
+        m1 += a[i]
+    for i in range(n2):
+        m2 += b[i]
+    m1 /= n1
+    m2 /= n2
+    
+    ss = 0.0
+    for i in range(n1):
+        ss += (a[i] - m1) * (a[i] - m1)
+    for i in range(n2):
+        ss += (b[i] - m2) * (b[i] - m2)
+    
+    df = n1 + n2 - 2
+    se = math.sqrt(ss / df * (1.0 / n1 + 1.0 / n2))
+    if se == 0.0:
+        if m1 == m2:
+            return math.nan, float(df)
+        return math.copysign(math.inf, m1 - m2), float(df)
+    return (m1 - m2) / se, float(df)
+
+
+# Prefer the ahead-of-time compiled kernels (built by summary_analyzer_cc.py) to
+# skip the JIT warm-up on the first call
+try:
+    if __package__:
+        from .summary_kernels import linreg_core as _linreg_core, ttest_core as _ttest_core
+    else:
+        from summary_kernels import linreg_core as _linreg_core, ttest_core as _ttest_core
+except ImportError:
+    pass
+
+
+@njit(cache=True)
+def _batch_linreg_kernel(dates, values, offsets):
+    """
+    Least-squares statistics for every series of flat concatenated arrays
+    
+    Args:
+        dates: float64 timestamps of all series back to back
+        values: float64 measurement values, same layout as dates
+        offsets: (N + 1,) series boundaries; series i is [offsets[i], offsets[i + 1])
+        
+    Returns:
+        tuple: (ssxx, slope, r_squared, t_stat) arrays of shape (N,), NaN/0/inf as in _linreg_core
+    """
+    rows = offsets.shape[0] - 1
+    ssxx = np.empty(rows)
+    slope = np.full(rows, np.nan)
+    r_squared = np.full(rows, np.nan)
+    t_stat = np.full(rows, np.nan)
+    for r in range(rows):
+        lo = offsets[r]
+        hi = offsets[r + 1]
+        n = hi - lo
+        mean_x = 0.0
+        mean_y = 0.0
+        for i in range(lo, hi):
+            mean_x += dates[i]
+            mean_y += values[i]
+        mean_x /= n
+        mean_y /= n
+        
+        sxx = 0.0
+        sxy = 0.0
+        syy = 0.0
+        for i in range(lo, hi):
+            dx = dates[i] - mean_x
+            dy = values[i] - mean_y
+            sxx += dx * dx
+            sxy += dx * dy
+            syy += dy * dy
+        
+        ssxx[r] = sxx
+        if sxx == 0.0:
+            continue
+        slope[r] = sxy / sxx
+        if syy == 0.0:
+            r_squared[r] = 0.0
+            t_stat[r] = 0.0
+            continue
+        r2 = min((sxy * sxy) / (sxx * syy), 1.0)
+        r_squared[r] = r2
+        if r2 >= 1.0:
+            t_stat[r] = math.inf
+        elif n > 2:
+            t_stat[r] = math.sqrt(r2 * (n - 2) / (1.0 - r2))
+    return ssxx, slope, r_squared, t_stat
+
+
+@njit(cache=True)
+def _batch_ttest_kernel(values, offsets):
+    """
+    Pooled-variance t statistic of first half vs second half for every series
+    of a flat concatenated array
+    
+    Args:
+        values: float64 measurement values of all series back to back
+        offsets: (N + 1,) series boundaries; series i is [offsets[i], offsets[i + 1])
+        
+    Returns:
+        tuple: (t_stat, degrees_of_freedom) arrays of shape (N,), NaN/inf as in _ttest_core
+    """
+    rows = offsets.shape[0] - 1
+    t_stat = np.full(rows, np.nan)
+    df = np.empty(rows)
+    for r in range(rows):
+        lo = offsets[r]
+        hi = offsets[r + 1]
+        n = hi - lo
+        n1 = n // 2
+        n2 = n - n1
+        mid = lo + n1
+        df[r] = n - 2
+        if n1 == 0 or n < 3:
+            continue
+        m1 = 0.0
+        m2 = 0.0
+        for i in range(lo, mid):
+            m1 += values[i]
+        for i in range(mid, hi):
+            m2 += values[i]
+        m1 /= n1
+        m2 /= n2
+        
+        ss = 0.0
+        for i in range(lo, mid):
+            ss += (values[i] - m1) * (values[i] - m1)
+        for i in range(mid, hi):
+            ss += (values[i] - m2) * (values[i] - m2)
+        
+        se = math.sqrt(ss / (n - 2) * (1.0 / n1 + 1.0 / n2))
+        if se == 0.0:
+            if m1 != m2:
+                t_stat[r] = math.copysign(math.inf, m1 - m2)
+        else:
+            t_stat[r] = (m1 - m2) / se
+    return t_stat, df
+
+
+def _batch_linregress(dates, values, offsets):
+    """
+    Least-squares fit for every series of flat concatenated arrays in one pass
+    
+    Args:
+        dates: float64 timestamps of all series back to back
+        values: float64 measurement values, same layout as dates
+        offsets: (N + 1,) series boundaries; series i is [offsets[i], offsets[i + 1])
+        
+    Returns:
+        tuple: (ssxx, slope, r_squared, p_value) arrays of shape (N,); p_value is NaN
+               where the slope is not significant at TREND_P_THRESHOLD
+    """
+    from scipy import special
+    ssxx, slope, r_squared, t_stat = _batch_linreg_kernel(dates, values, offsets)
+    df = np.diff(offsets) - 2.0
+    # The t CDF is only evaluated for rows that can be significant, NaN elsewhere
+    with np.errstate(invalid='ignore'):
+        significant = t_stat >= special.stdtrit(df, 1.0 - TREND_P_THRESHOLD / 2.0)
+    p_value = np.full(len(df), np.nan)
+    p_value[significant] = 2.0 * special.stdtr(df[significant], -t_stat[significant])
+    return ssxx, slope, r_squared, p_value
+
+
+def _batch_ttest(values, offsets):
+    """
+    Two-sample t-test (pooled variance) of first half vs second half for every series
+    
+    Args:
+        values: float64 measurement values of all series back to back
+        offsets: (N + 1,) series boundaries; series i is [offsets[i], offsets[i + 1])
+        
+    Returns:
+        ndarray: Two-sided p-values of shape (N,)
+    """
+    from scipy import special
+    t_stat, df = _batch_ttest_kernel(values, offsets)
+    return 2.0 * special.stdtr(df, -np.abs(t_stat))
+
+
+class OnlineLinReg:
+    """
+    Incrementally maintained least-squares statistics for a (timestamp, value) series.
+    Uses Welford-style centred sums, so adding a measurement is O(1) and stays
+    numerically stable for large timestamps. Serializes to a plain dict so it can
+    be persisted with a summary and resumed on the next analysis.
+    """
+    __slots__ = ('n', 'mean_x', 'mean_y', 'sxx', 'sxy', 'syy', 'last_x')
+    
+    def __init__(self, n=0, mean_x=0.0, mean_y=0.0, sxx=0.0, sxy=0.0, syy=0.0, last_x=None):
+        self.n = n
+        self.mean_x = mean_x
+        self.mean_y = mean_y
+        self.sxx = sxx
+        self.sxy = sxy
+        self.syy = syy
+        self.last_x = last_x
+    
+    @classmethod
+    def from_arrays(cls, x, y):
+        """Build the state for a whole series in one vectorized pass"""
+        if len(x) == 0:
+            return cls()
+        mean_x = float(x.mean())
+        mean_y = float(y.mean())
+        dx = x - mean_x
+        dy = y - mean_y
+        return cls(len(x), mean_x, mean_y, float(np.dot(dx, dx)), float(np.dot(dx, dy)),
+                   float(np.dot(dy, dy)), float(x[-1]))
+    
+    @classmethod
+    def from_flat_arrays(cls, x, y, offsets):
+        """
+        Build the states of many series laid out back to back, as for _batch_linreg_kernel
+        
+        Args:
+            x: float64 timestamps of all series back to back
+            y: float64 values, same layout as x
+            offsets: (N + 1,) series boundaries; every series must be non-empty
+            
+        Returns:
+            list: N states, in series order
+        """
+        starts = offsets[:-1]
+        counts = np.diff(offsets)
+        mean_x = np.add.reduceat(x, starts) / counts
+        mean_y = np.add.reduceat(y, starts) / counts
+        dx = x - np.repeat(mean_x, counts)
+        dy = y - np.repeat(mean_y, counts)
+        sxx = np.add.reduceat(dx * dx, starts)
+        sxy = np.add.reduceat(dx * dy, starts)
+        syy = np.add.reduceat(dy * dy, starts)
+        last_x = x[offsets[1:] - 1]
+        return [cls(*state) for state in zip(counts.tolist(), mean_x.tolist(), mean_y.tolist(), sxx.tolist(),
+                                              sxy.tolist(), syy.tolist(), last_x.tolist())]
+    
+    @classmethod
+    def from_dict(cls, data):
+        """Restore a state produced by to_dict"""
+        return cls(**{name: data[name] for name in cls.__slots__})
+    
+    def to_dict(self):
+        """Serialize the state to a JSON-compatible dict"""
+        return {name: getattr(self, name) for name in self.__slots__}
+    
+    def update(self, x, y):
+        """Add one (timestamp, value) point"""
+        self.n += 1
+        dx = x - self.mean_x
+        self.mean_x += dx / self.n
+        dy = y - self.mean_y
+        self.mean_y += dy / self.n
+        self.sxx += dx * (x - self.mean_x)
+        self.sxy += dx * (y - self.mean_y)
+        self.syy += dy * (y - self.mean_y)
+        self.last_x = x
+    
+    def stats(self):
+        """
+        Regression statistics of the points seen so far
+        
+        Returns:
+            tuple: (ssxx, slope, r_squared, t_stat) with the same conventions as _linreg_core
+        """
+        if self.sxx == 0.0:
+            return self.sxx, math.nan, math.nan, math.nan
+        slope = self.sxy / self.sxx
+        if self.syy == 0.0:
+            return self.sxx, slope, 0.0, 0.0
+        r_squared = min((self.sxy * self.sxy) / (self.sxx * self.syy), 1.0)
+        if r_squared >= 1.0:
+            return self.sxx, slope, r_squared, math.inf
+        return self.sxx, slope, r_squared, math.sqrt(r_squared * (self.n - 2) / (1.0 - r_squared))
+
+
+@dataclass(slots=True, eq=False)
+class PerformanceSummary(Mapping):
+    """
+    Fixed-schema performance summary of a task. Fields are stored in slots
+    rather than a per-instance dict, while the Mapping interface keeps
+    summary['key'] / summary.get('key') working for existing callers.
+    dict(summary) or to_dict() gives a plain dict for JSON serialization.
+    """
+    task_id: object
+    task_title: object
+    issue_type: object
+    entity_id: object
+    entity_type: object
+    entity_name: object
+    measurements_count: int
+    monitoring_period: dict
+    overall_metrics: dict
+    trend_analysis: dict
+    significance_test: dict
+    moving_average: dict
+    period_changes: list
+    status: str
+    analyzed_at: str
+    # Set after analysis; left out of the mapping while None
+    trend_state: dict = None
+    summary_id: object = None
+    
+    def _keys(self):
+        return [f.name for f in fields(self)
+                if f.name not in _OPTIONAL_SUMMARY_FIELDS or getattr(self, f.name) is not None]
+    
+    def __getitem__(self, key):
+        if not isinstance(key, str) or key not in self._keys():
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def __setitem__(self, key, value):
+        if key not in self.__slots__:
+            raise KeyError(f"PerformanceSummary has no field {key!r}")
+        setattr(self, key, value)
+    
+    def __iter__(self):
+        return iter(self._keys())
+    
+    def __len__(self):
+        return len(self._keys())
+    
+    def to_dict(self):
+        """Convert to a plain (deep-copied) dict"""
+        return {key: value for key, value in asdict(self).items()
+                if key not in _OPTIONAL_SUMMARY_FIELDS or value is not None}
+
+
+_OPTIONAL_SUMMARY_FIELDS = ('trend_state', 'summary_id')
+
+
 class SummaryAnalyzer:
     """
     Analyzes measurement data to generate performance metrics.
@@ -18,7 +456,10 @@ class SummaryAnalyzer:
     """
     def __init__(self):
         self.today = datetime.now().date()
-        print(f"ANALYZER: Initializing for {self.today}")
+        logger.debug("Initializing for %s", self.today)
+        
+        # (task_id, content digest) -> summary, least recently used first
+        self._summary_cache = OrderedDict()
     
     def calculate_percentage_change(self, baseline_value, latest_value, issue_type):
         """
@@ -40,6 +481,53 @@ class SummaryAnalyzer:
         
         return ((latest_value - baseline_value) / baseline_value) * 100.0
     
+    def _measurement_values(self, measurements):
+        """Convert measurement values to a float64 array once, filled in place without an intermediate list"""
+        # NumPy converts each value while filling; it turns None into NaN where float() raised
+        values = np.fromiter(map(_get_value, measurements), dtype=np.float64, count=len(measurements))
+        if np.isnan(values).any():
+            raise TypeError("Measurement values must be numbers")
+        return values
+    
+    def _measurement_datetimes(self, measurements):
+        """Parse measurement dates once into a datetime64[us] array (UTC for timezone-aware dates)"""
+        raw = [m['measurement_date'] for m in measurements]
+        try:
+            # numpy only warns on timezone offsets, so treat that as a parse failure
+            with warnings.catch_warnings():
+                warnings.simplefilter('error')
+                return np.array(raw, dtype='datetime64[us]')
+        except (ValueError, TypeError, UserWarning, DeprecationWarning):
+            parsed = [datetime.fromisoformat(d) for d in raw]
+            return np.array([d.astimezone(timezone.utc).replace(tzinfo=None) if d.tzinfo else d
+                             for d in parsed], dtype='datetime64[us]')
+    
+    def _sort_chronologically(self, measurements, values, datetimes):
+        """
+        Make sure measurements are in date order; the database returns them sorted,
+        so the common case is a single comparison pass without reordering
+        
+        Args:
+            measurements: List of measurement records
+            values: float64 array of the measurement values
+            datetimes: datetime64 array of the measurement dates
+            
+        Returns:
+            tuple: (measurements, values, datetimes) in chronological order
+        """
+        if len(datetimes) < 2 or not (datetimes[1:] < datetimes[:-1]).any():
+            return measurements, values, datetimes
+        
+        logger.debug("Measurements were not in date order, sorting them")
+        order = np.argsort(datetimes, kind='stable')
+        return [measurements[i] for i in order], values[order], datetimes[order]
+    
+    def _measurement_timestamps(self, measurements, datetimes=None):
+        """Convert measurement dates to a float64 array of timestamps in seconds"""
+        if datetimes is None:
+            datetimes = self._measurement_datetimes(measurements)
+        return datetimes.astype(np.int64) / 1e6
+    
     def analyze_trend(self, measurements, issue_type):
         """
         Analyze trend using linear regression
@@ -52,73 +540,151 @@ class SummaryAnalyzer:
             dict: Trend analysis results
         """
         if len(measurements) < 3:
-            return {
-                'slope': None,
-                'r_squared': None,
-                'p_value': None,
-                'is_improving': None,
-                'trend_description': "Insufficient data for trend analysis"
-            }
+            return self._insufficient_trend()
         
         try:
-            # Extract dates and values as numpy arrays
-            dates = np.array([datetime.fromisoformat(m['measurement_date']).timestamp() for m in measurements])
-            values = np.array([float(m['value']) for m in measurements])
-            
-            # Normalize the dates for better numerical stability
-            dates = dates - dates[0]  # Start from zero
-            
-            # Perform linear regression with numpy arrays
-            # linregress returns (slope, intercept, r_value, p_value, std_err)
-            result = stats.linregress(dates, values)
-            
-            # Fix for Pylance type errors: explicitly extract values from result tuple
-            slope = float(result[0]) if result[0] is not None else 0.0
-            intercept = float(result[1]) if result[1] is not None else 0.0
-            r_value = float(result[2]) if result[2] is not None else 0.0
-            p_value = float(result[3]) if result[3] is not None else 1.0
-            std_err = float(result[4]) if result[4] is not None else 0.0
+            dates = self._measurement_timestamps(measurements)
+            values = self._measurement_values(measurements)
+        except Exception as e:
+            logger.warning("Error in trend analysis: %s", e)
+            return self._trend_error(e)
+        return self._analyze_trend_arrays(dates, values, issue_type)
+    
+    def _analyze_trend_arrays(self, dates, values, issue_type):
+        """
+        Analyze trend using linear regression on pre-extracted arrays
+        
+        Args:
+            dates: float64 array of measurement timestamps
+            values: float64 array of measurement values
+            issue_type: Type of issue being measured
             
-            # Determine if trend is improving
-            # For time metrics, negative slope is good (times decreasing)
-            if issue_type in ['response_time', 'repair_time']:
-                is_improving = slope < 0.0
-            else:
-                is_improving = slope > 0.0
+        Returns:
+            dict: Trend analysis results
+        """
+        if len(values) < 3:
+            return self._insufficient_trend()
+        
+        try:
+            # Closed-form least squares (compiled kernel)
+            return self._trend_from_stats(len(values), *_linreg_core(dates, values), issue_type)
+        except Exception as e:
+            logger.warning("Error in trend analysis: %s", e)
+            return self._trend_error(e)
+    
+    def _trend_from_stats(self, n, ssxx, slope, r_squared, t_stat, issue_type):
+        """
+        Build the trend analysis result from regression statistics
+        The p-value uses the Student t CDF directly: t = r * sqrt((n - 2) / (1 - r^2)) with n - 2 dof,
+        and is only computed when t reaches the critical value; otherwise it is reported as None
+        """
+        if ssxx == 0.0:
+            raise ValueError("Cannot calculate a linear regression if all x values are identical")
+        if not t_stat >= _critical_t(n - 2):
+            return self._trend_result(slope, r_squared, None, issue_type)
+        from scipy import special
+        p_value = float(2.0 * special.stdtr(n - 2, -t_stat))
+        return self._trend_result(slope, r_squared, p_value, issue_type)
+    
+    def _trend_from_state(self, trend_state, issue_type):
+        """Trend analysis result from an up-to-date OnlineLinReg state"""
+        try:
+            return self._trend_from_stats(trend_state.n, *trend_state.stats(), issue_type)
+        except Exception as e:
+            logger.warning("Error in trend analysis: %s", e)
+            return self._trend_error(e)
+    
+    def _resume_trend_state(self, prior_state, dates, values):
+        """
+        Bring a persisted OnlineLinReg state up to date using only the measurements
+        added since it was saved
+        
+        Args:
+            prior_state: Dict produced by OnlineLinReg.to_dict on an earlier analysis
+            dates: float64 array of measurement timestamps (chronological)
+            values: float64 array of measurement values
             
-            # Calculate r-squared
-            r_squared = r_value * r_value
+        Returns:
+            OnlineLinReg: Updated state, or None if the prior state does not cover
+                          exactly the earlier measurements of this series
+        """
+        try:
+            state = OnlineLinReg.from_dict(prior_state)
+        except (KeyError, TypeError):
+            return None
+        if state.last_x is None:
+            return None
+        
+        seen = int(np.searchsorted(dates, state.last_x, side='right'))
+        if seen != state.n:
+            return None
+        for x, y in zip(dates[seen:].tolist(), values[seen:].tolist()):
+            state.update(x, y)
+        return state
+    
+    def _insufficient_trend(self):
+        """Trend analysis result for a series with fewer than 3 measurements"""
+        return {
+            'slope': None,
+            'r_squared': None,
+            'p_value': None,
+            'is_improving': None,
+            'trend_description': "Insufficient data for trend analysis"
+        }
+    
+    def _trend_result(self, slope, r_squared, p_value, issue_type):
+        """
+        Build the trend analysis result from regression statistics
+        
+        Args:
+            slope: Regression slope (value units per second)
+            r_squared: Coefficient of determination
+            p_value: Two-sided p-value of the slope, None if it is known to exceed TREND_P_THRESHOLD
+            issue_type: Type of issue being measured
             
-            # Create description of trend
-            if p_value <= 0.05:
-                if r_squared >= 0.7:
-                    strength = "strong"
-                elif r_squared >= 0.3:
-                    strength = "moderate"
-                else:
-                    strength = "weak"
-                    
-                direction = "improving" if is_improving else "deteriorating"
-                trend_description = f"{strength} {direction} trend (p={p_value:.3f}, r²={r_squared:.2f})"
+        Returns:
+            dict: Trend analysis results
+        """
+        # Determine if trend is improving
+        # For time metrics, negative slope is good (times decreasing)
+        if issue_type in ['response_time', 'repair_time']:
+            is_improving = slope < 0.0
+        else:
+            is_improving = slope > 0.0
+        
+        # Create description of trend
+        if p_value is None:
+            trend_description = f"no statistically significant trend (p>{TREND_P_THRESHOLD:g})"
+        elif p_value <= TREND_P_THRESHOLD:
+            if r_squared >= 0.7:
+                strength = "strong"
+            elif r_squared >= 0.3:
+                strength = "moderate"
             else:
-                trend_description = f"no statistically significant trend (p={p_value:.3f})"
-            
-            return {
-                'slope': slope,
-                'r_squared': r_squared,
-                'p_value': p_value,
-                'is_improving': bool(is_improving),
-                'trend_description': trend_description
-            }
-        except Exception as e:
-            print(f"ANALYZER: Error in trend analysis: {e}")
-            return {
-                'slope': None,
-                'r_squared': None,
-                'p_value': None,
-                'is_improving': None,
-                'trend_description': f"Error in trend analysis: {e}"
-            }
+                strength = "weak"
+                
+            direction = "improving" if is_improving else "deteriorating"
+            trend_description = f"{strength} {direction} trend (p={p_value:.3f}, r²={r_squared:.2f})"
+        else:
+            trend_description = f"no statistically significant trend (p={p_value:.3f})"
+        
+        return {
+            'slope': slope,
+            'r_squared': r_squared,
+            'p_value': p_value,
+            'is_improving': bool(is_improving),
+            'trend_description': trend_description
+        }
+    
+    def _trend_error(self, error):
+        """Trend analysis result for a series that could not be analyzed"""
+        return {
+            'slope': None,
+            'r_squared': None,
+            'p_value': None,
+            'is_improving': None,
+            'trend_description': f"Error in trend analysis: {error}"
+        }
     
     def calculate_moving_average(self, measurements, window=3):
         """
@@ -133,10 +699,60 @@ class SummaryAnalyzer:
         """
         if len(measurements) < window:
             return None
+        return self._moving_average(self._measurement_values(measurements[-window:]), window)
+    
+    def _moving_average(self, values, window=3):
+        """
+        Calculate moving average of the last N values
         
-        recent_measurements = measurements[-window:]
-        values = [float(m['value']) for m in recent_measurements]
-        return sum(values) / len(values)
+        Args:
+            values: float64 array of measurement values
+            window: Number of values to include in the average
+            
+        Returns:
+            float: Moving average or None if not enough values
+        """
+        if len(values) < window:
+            return None
+        if window == 3:
+            # The default window: add the three scalars directly rather than slicing into NumPy
+            return (values.item(-3) + values.item(-2) + values.item(-1)) / 3.0
+        return float(values[-window:].mean())
+    
+    def calculate_rolling_averages(self, measurements, window=3):
+        """
+        Calculate the moving average at every point of the series
+        
+        Args:
+            measurements: List of measurement records
+            window: Number of measurements in each average
+            
+        Returns:
+            list: len(measurements) - window + 1 averages, the last one being the
+                  current moving average; empty if not enough measurements
+        """
+        if len(measurements) < window:
+            return []
+        return self._rolling_mean(self._measurement_values(measurements), window).tolist()
+    
+    def _rolling_mean(self, values, window=3):
+        """
+        Moving averages of all full windows in O(n) via convolution
+        
+        Args:
+            values: float64 array of measurement values
+            window: Number of values in each average
+            
+        Returns:
+            ndarray: len(values) - window + 1 averages
+        """
+        if len(values) < window:
+            return np.empty(0)
+        kernel = np.full(window, 1.0 / window)
+        if window >= FFT_WINDOW_THRESHOLD:
+            from scipy import signal
+            return signal.fftconvolve(values, kernel, mode='valid')
+        return np.convolve(values, kernel, mode='valid')
     
     def check_significance(self, measurements):
         """
@@ -149,7 +765,27 @@ class SummaryAnalyzer:
         Returns:
             dict: Significance test results
         """
-        if len(measurements) < 4:  # Need at least 4 for meaningful comparison
+        if len(measurements) < 4:
+            return self._check_significance_values(np.empty(0))
+        
+        try:
+            values = self._measurement_values(measurements)
+        except Exception as e:
+            logger.warning("Error in significance testing: %s", e)
+            return self._significance_error(e)
+        return self._check_significance_values(values)
+    
+    def _check_significance_values(self, values):
+        """
+        Compare the first half of the values to the second half with a t-test
+        
+        Args:
+            values: float64 array of measurement values
+            
+        Returns:
+            dict: Significance test results
+        """
+        if len(values) < 4:  # Need at least 4 for meaningful comparison
             return {
                 'is_significant': False,
                 'p_value': None,
@@ -158,45 +794,57 @@ class SummaryAnalyzer:
             }
         
         try:
-            # Split measurements into first and second half
-            midpoint = len(measurements) // 2
-            first_half = np.array([float(m['value']) for m in measurements[:midpoint]])
-            second_half = np.array([float(m['value']) for m in measurements[midpoint:]])
-            
-            # Perform t-test with numpy arrays
-            # ttest_ind returns (t-statistic, p-value)
-            result = stats.ttest_ind(first_half, second_half)
-            
-            # Fix for Pylance type errors: explicitly extract values
-            t_stat = float(result[0]) if result[0] is not None else 0.0
-            p_value = float(result[1]) if result[1] is not None else 1.0
+            # Split values into first and second half
+            midpoint = len(values) // 2
             
-            # Calculate confidence level
-            confidence = (1.0 - p_value) * 100.0
+            # Pooled-variance t-test (compiled kernel), two-sided p-value from the t CDF.
+            # Kept pooled rather than Welch so results match the former ttest_ind(equal_var=True)
+            t_stat, df = _ttest_core(values[:midpoint], values[midpoint:])
+            from scipy import special
+            p_value = float(2.0 * special.stdtr(df, -abs(t_stat)))
             
-            # Determine if significant based on threshold
-            is_significant = p_value <= 0.10
-            
-            # Generate description
-            if is_significant:
-                description = f"Statistically significant change ({confidence:.1f}% confidence)"
-            else:
-                description = f"Not statistically significant ({confidence:.1f}% confidence)"
-            
-            return {
-                'is_significant': bool(is_significant),
-                'p_value': float(p_value),
-                'confidence': float(confidence),
-                'description': description
-            }
+            return self._significance_result(p_value)
         except Exception as e:
-            print(f"ANALYZER: Error in significance testing: {e}")
-            return {
-                'is_significant': False,
-                'p_value': None,
-                'confidence': None,
-                'description': f"Error in significance testing: {e}"
-            }
+            logger.warning("Error in significance testing: %s", e)
+            return self._significance_error(e)
+    
+    def _significance_error(self, error):
+        """Significance test result for a series that could not be tested"""
+        return {
+            'is_significant': False,
+            'p_value': None,
+            'confidence': None,
+            'description': f"Error in significance testing: {error}"
+        }
+    
+    def _significance_result(self, p_value):
+        """
+        Build the significance test result from a p-value
+        
+        Args:
+            p_value: Two-sided p-value of the first-half vs second-half comparison
+            
+        Returns:
+            dict: Significance test results
+        """
+        # Calculate confidence level
+        confidence = (1.0 - p_value) * 100.0
+        
+        # Determine if significant based on threshold
+        is_significant = p_value <= 0.10
+        
+        # Generate description
+        if is_significant:
+            description = f"Statistically significant change ({confidence:.1f}% confidence)"
+        else:
+            description = f"Not statistically significant ({confidence:.1f}% confidence)"
+        
+        return {
+            'is_significant': bool(is_significant),
+            'p_value': float(p_value),
+            'confidence': float(confidence),
+            'description': description
+        }
     
     def calculate_period_changes(self, measurements, issue_type):
         """
@@ -209,71 +857,334 @@ class SummaryAnalyzer:
         Returns:
             list: List of period-to-period changes
         """
-        period_changes = []
-        for i in range(1, len(measurements)):
-            prev = float(measurements[i-1]['value'])
-            curr = float(measurements[i]['value'])
-            period_change = self.calculate_percentage_change(prev, curr, issue_type)
-            period_changes.append({
-                'from_date': measurements[i-1]['measurement_date'],
-                'to_date': measurements[i]['measurement_date'],
-                'from_value': prev,
-                'to_value': curr,
-                'change_pct': period_change
-            })
-        return period_changes
+        return self._period_changes(measurements, self._measurement_values(measurements), issue_type)
+    
+    def _period_changes(self, measurements, values, issue_type):
+        """
+        Calculate changes between consecutive values
+        
+        Args:
+            measurements: List of measurement records (for the dates)
+            values: float64 array of measurement values
+            issue_type: Type of issue being measured
+            
+        Returns:
+            list: List of period-to-period changes
+        """
+        prev = values[:-1]
+        curr = values[1:]
+        # Same rule as calculate_percentage_change: 0% when the previous value is 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            change_pct = np.where(prev != 0, (curr - prev) / prev * 100.0, 0.0)
+        dates = [m['measurement_date'] for m in measurements]
+        return [
+            {
+                'from_date': from_date,
+                'to_date': to_date,
+                'from_value': from_value,
+                'to_value': to_value,
+                'change_pct': pct
+            }
+            for from_date, to_date, from_value, to_value, pct
+            in zip(dates[:-1], dates[1:], prev.tolist(), curr.tolist(), change_pct.tolist())
+        ]
+    
+    def _content_key(self, task_data):
+        """
+        Cache key for task data: the task ID plus a 64-bit digest of the task fields
+        used in the summary and every measurement's (date, value)
+        
+        Returns:
+            tuple: (task_id, digest), or None if the data cannot be hashed
+        """
+        task = task_data['task']
+        h = xxhash.xxh64() if xxhash is not None else hashlib.blake2b(digest_size=8)
+        try:
+            for field in ('title', 'issue_type', 'entity_id', 'entity_type', 'mechanic_name'):
+                h.update(repr(task.get(field)).encode())
+            baseline = task_data.get('baseline')
+            if baseline is not None:
+                h.update(f"{baseline['measurement_date']}|{task_data.get('measurements_count')}".encode())
+                h.update(struct.pack('<d', float(baseline['value'])))
+            for m in task_data['measurements']:
+                h.update(str(m['measurement_date']).encode())
+                h.update(struct.pack('<d', float(m['value'])))
+        except (KeyError, TypeError, ValueError):
+            return None
+        return task.get('id'), h.digest()
+    
+    def _copy_summary(self, summary):
+        """Shallow copy, so callers setting summary['summary_id'] do not touch the cached one"""
+        return replace(summary) if isinstance(summary, PerformanceSummary) else dict(summary)
     
     def analyze_task_data(self, task_data):
         """
         Analyze task data to generate comprehensive performance summary
+        If the same task was analyzed before with identical measurements, the
+        earlier summary is returned without recomputing it
         
         Args:
-            task_data: Dictionary with task and measurements data
+            task_data: Dictionary with task and measurements data, and optionally the
+                       'trend_state' saved in a previous summary of the same task
             
         Returns:
-            dict: Comprehensive performance summary
+            dict: Comprehensive performance summary, including the 'trend_state'
+                  to pass in on the next analysis
         """
+        key = self._content_key(task_data)
+        if key is not None and key in self._summary_cache:
+            self._summary_cache.move_to_end(key)
+            logger.debug("Measurements unchanged for task ID %s, reusing summary", key[0])
+            return self._copy_summary(self._summary_cache[key])
+        
+        summary = self._analyze_task_data(task_data)
+        
+        if key is not None:
+            self._summary_cache[key] = self._copy_summary(summary)
+            if len(self._summary_cache) > SUMMARY_CACHE_SIZE:
+                self._summary_cache.popitem(last=False)
+        return summary
+    
+    def _analyze_task_data(self, task_data):
+        """Uncached analysis behind analyze_task_data"""
         task = task_data['task']
         measurements = task_data['measurements']
         task_id = task.get('id')
         
-        print(f"ANALYZER: Analyzing task ID {task_id}: {task.get('title')}")
+        # Data from SummaryDataCollector.collect_recent: baseline plus the latest window
+        if task_data.get('baseline') is not None:
+            return self._analyze_recent(task_data)
+        
+        logger.debug("Analyzing task ID %s: %s", task_id, task.get('title'))
         
         # Check if we have enough measurements
         if not measurements or len(measurements) < 2:
-            print(f"ANALYZER: Insufficient measurements for task ID {task_id}")
-            return {
-                'task_id': task_id,
-                'status': 'insufficient_data',
-                'message': f"Only {len(measurements)} measurements available. Need at least 2 for analysis."
-            }
+            return self._insufficient_summary(task_id, measurements)
+        
+        # Get issue type for determining improvement direction
+        issue_type = task.get('issue_type')
+        
+        # Convert measurement values once; every metric below works on this array
+        values = self._measurement_values(measurements)
+        
+        # Parse the dates once; reused for ordering, the regression and the monitoring period
+        try:
+            datetimes = self._measurement_datetimes(measurements)
+        except Exception as e:
+            datetimes = None
+            date_error = e
+        else:
+            measurements, values, datetimes = self._sort_chronologically(measurements, values, datetimes)
+        
+        # Perform trend analysis
+        trend_state = None
+        if len(values) < 3:
+            trend = self._insufficient_trend()
+        elif datetimes is None:
+            logger.warning("Error in trend analysis: %s", date_error)
+            trend = self._trend_error(date_error)
+        else:
+            dates = self._measurement_timestamps(measurements, datetimes)
+            # Resume from the state saved by a previous analysis when possible,
+            # so only the new measurements are processed
+            if task_data.get('trend_state'):
+                trend_state = self._resume_trend_state(task_data['trend_state'], dates, values)
+            if trend_state is not None:
+                trend = self._trend_from_state(trend_state, issue_type)
+            else:
+                trend = self._analyze_trend_arrays(dates, values, issue_type)
+                trend_state = OnlineLinReg.from_arrays(dates, values)
+    
+        # Check statistical significance
+        significance = self._check_significance_values(values)
+        
+        summary = self._build_summary(task, measurements, values, trend, significance, datetimes)
+        if trend_state is not None:
+            summary['trend_state'] = trend_state.to_dict()
+        return summary
+    
+    def _analyze_recent(self, task_data):
+        """
+        Summarize a task from its baseline and latest measurements only
+        The overall change and moving average are exact; trend and significance
+        analysis need the full history and are reported as not computed
+        
+        Args:
+            task_data: Dictionary with task, baseline, recent measurements and measurements_count
+            
+        Returns:
+            dict: Performance summary
+        """
+        task = task_data['task']
+        baseline = task_data['baseline']
+        recent = task_data['measurements']
+        count = task_data.get('measurements_count', len(recent))
+        
+        # The recent window already holds the whole history
+        if count <= len(recent):
+            return self.analyze_task_data({'task': task, 'measurements': recent})
+        
+        logger.debug("Analyzing task ID %s: %s (recent measurements only)", task.get('id'), task.get('title'))
+        
+        measurements = [baseline] + recent
+        values = self._measurement_values(measurements)
+        trend = {
+            'slope': None,
+            'r_squared': None,
+            'p_value': None,
+            'is_improving': None,
+            'trend_description': "Trend not computed (recent measurements only)"
+        }
+        significance = {
+            'is_significant': False,
+            'p_value': None,
+            'confidence': None,
+            'description': "Significance not computed (recent measurements only)"
+        }
+        
+        summary = self._build_summary(task, measurements, values, trend, significance)
+        summary['measurements_count'] = count
+        return summary
+    
+    def analyze_tasks_batch(self, task_data_list):
+        """
+        Analyze many tasks at once, computing the trend regression and
+        significance test for all of them in a single vectorized pass
+        Tasks whose 'trend_state' (from SummaryDataCollector) still matches their
+        earlier measurements are resumed from it one by one, processing only the new
+        measurements; the rest go through the vectorized pass. Every summary with a
+        trend carries its 'trend_state' for the next analysis
+        
+        Args:
+            task_data_list: List of dictionaries with task and measurements data
+            
+        Returns:
+            list: Performance summaries in the same order as task_data_list
+        """
+        summaries = [None] * len(task_data_list)
+        rows = []
+        series = []
+        
+        for i, task_data in enumerate(task_data_list):
+            task = task_data['task']
+            measurements = task_data['measurements']
+            if task_data.get('baseline') is not None:
+                summaries[i] = self.analyze_task_data(task_data)
+                continue
+            logger.debug("Analyzing task ID %s: %s", task.get('id'), task.get('title'))
+            if not measurements or len(measurements) < 2:
+                summaries[i] = self._insufficient_summary(task.get('id'), measurements)
+                continue
+            try:
+                datetimes = self._measurement_datetimes(measurements)
+                values = self._measurement_values(measurements)
+                measurements, values, datetimes = self._sort_chronologically(measurements, values, datetimes)
+                dates = self._measurement_timestamps(measurements, datetimes)
+            except (KeyError, TypeError, ValueError):
+                # Malformed measurements get the per-task path and its error reporting
+                summaries[i] = self.analyze_task_data(task_data)
+                continue
+            trend_state = None
+            if task_data.get('trend_state') and len(values) >= 3:
+                trend_state = self._resume_trend_state(task_data['trend_state'], dates, values)
+            if trend_state is not None:
+                trend = self._trend_from_state(trend_state, task.get('issue_type'))
+                significance = self._check_significance_values(values)
+                summaries[i] = self._build_summary(task, measurements, values, trend, significance, datetimes)
+                summaries[i]['trend_state'] = trend_state.to_dict()
+                continue
+            rows.append(i)
+            series.append((dates, values, datetimes, measurements))
+        
+        if not rows:
+            return summaries
+        
+        # Concatenate all series back to back (no padding); offsets mark where each one starts
+        lengths = np.array([len(values) for _, values, _, _ in series])
+        offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        dates = np.concatenate([row_dates for row_dates, _, _, _ in series])
+        values = np.concatenate([row_values for _, row_values, _, _ in series])
+        
+        ssxx, slopes, r_squared, trend_p = _batch_linregress(dates, values, offsets)
+        significance_p = _batch_ttest(values, offsets)
+        trend_states = OnlineLinReg.from_flat_arrays(dates, values, offsets)
+        
+        for r, i in enumerate(rows):
+            task = task_data_list[i]['task']
+            _, row_values, datetimes, measurements = series[r]
+            issue_type = task.get('issue_type')
+            
+            if lengths[r] < 3:
+                trend = self._insufficient_trend()
+            elif ssxx[r] == 0.0:
+                trend = self._trend_error("Cannot calculate a linear regression if all x values are identical")
+            else:
+                p_value = None if np.isnan(trend_p[r]) else float(trend_p[r])
+                trend = self._trend_result(float(slopes[r]), float(r_squared[r]), p_value, issue_type)
+            
+            if lengths[r] < 4:
+                significance = self._check_significance_values(row_values)
+            else:
+                significance = self._significance_result(float(significance_p[r]))
+            
+            summaries[i] = self._build_summary(task, measurements, row_values, trend, significance, datetimes)
+            # As analyze_task_data, which keeps a state once a trend is analyzed
+            if lengths[r] >= 3:
+                summaries[i]['trend_state'] = trend_states[r].to_dict()
+        
+        return summaries
+    
+    def _insufficient_summary(self, task_id, measurements):
+        """Summary for a task with fewer than 2 measurements"""
+        logger.debug("Insufficient measurements for task ID %s", task_id)
+        return {
+            'task_id': task_id,
+            'status': 'insufficient_data',
+            'message': f"Only {len(measurements)} measurements available. Need at least 2 for analysis."
+        }
+    
+    def _build_summary(self, task, measurements, values, trend, significance, datetimes=None):
+        """
+        Compile the performance summary for a task from its measurements
+        and precomputed trend/significance results
+        
+        Args:
+            task: Task record
+            measurements: List of measurement records (at least 2)
+            values: float64 array of the measurement values
+            trend: Result of the trend analysis
+            significance: Result of the significance test
+            datetimes: Parsed measurement dates (datetime64 array); the endpoints are parsed here if omitted
+            
+        Returns:
+            dict: Comprehensive performance summary
+        """
+        task_id = task.get('id')
+        if datetimes is None:
+            # Only the endpoints are needed for the monitoring period
+            datetimes = self._measurement_datetimes([measurements[0], measurements[-1]])
         
         # Get issue type for determining improvement direction
         issue_type = task.get('issue_type')
         
         # Calculate overall change
-        baseline = measurements[0]
-        latest = measurements[-1]
+        baseline_value = float(values[0])
+        latest_value = float(values[-1])
         overall_change_pct = self.calculate_percentage_change(
-            float(baseline['value']), float(latest['value']), issue_type
+            baseline_value, latest_value, issue_type
         )
         
         # Calculate recent moving average
-        moving_avg = self.calculate_moving_average(measurements)
+        moving_avg = self._moving_average(values)
         recent_change = None
-        if moving_avg is not None and len(measurements) >= 3:
+        if moving_avg is not None and len(values) >= 3:
             recent_change = self.calculate_percentage_change(
-                float(baseline['value']), moving_avg, issue_type
+                baseline_value, moving_avg, issue_type
             )
         
-        # Perform trend analysis
-        trend = self.analyze_trend(measurements, issue_type)
-        
-        # Check statistical significance
-        significance = self.check_significance(measurements)
-        
         # Calculate period-to-period changes
-        period_changes = self.calculate_period_changes(measurements, issue_type)
+        period_changes = self._period_changes(measurements, values, issue_type)
         
         # For time metrics, improvement is negative change (decreasing time)
         # For non-time metrics, improvement is positive change (increasing value)
@@ -286,42 +1197,42 @@ class SummaryAnalyzer:
             improvement_pct = -overall_change_pct
         
         # Compile results
-        summary = {
-            'task_id': task_id,
-            'task_title': task.get('title'),
-            'issue_type': issue_type,
-            'entity_id': task.get('entity_id'),
-            'entity_type': task.get('entity_type'),
-            'entity_name': task.get('mechanic_name'),
-            'measurements_count': len(measurements),
-            'monitoring_period': {
+        summary = PerformanceSummary(
+            task_id=task_id,
+            task_title=task.get('title'),
+            issue_type=issue_type,
+            entity_id=task.get('entity_id'),
+            entity_type=task.get('entity_type'),
+            entity_name=task.get('mechanic_name'),
+            measurements_count=len(measurements),
+            monitoring_period={
                 'start': measurements[0]['measurement_date'],
                 'end': measurements[-1]['measurement_date'],
-                'duration_days': (datetime.fromisoformat(measurements[-1]['measurement_date']) - 
-                                datetime.fromisoformat(measurements[0]['measurement_date'])).days
+                'duration_days': int((datetimes[-1] - datetimes[0]) // np.timedelta64(1, 'D'))
             },
-            'overall_metrics': {
-                'baseline_value': float(baseline['value']),
-                'latest_value': float(latest['value']),
+            overall_metrics={
+                'baseline_value': baseline_value,
+                'latest_value': latest_value,
                 'raw_change_pct': round(overall_change_pct, 2),
                 'improvement_pct': round(improvement_pct, 2),  # Normalized for consistent interpretation
                 'improved': improvement_pct > 0.0
             },
-            'trend_analysis': trend,
-            'significance_test': significance,
-            'moving_average': {
+            trend_analysis=trend,
+            significance_test=significance,
+            moving_average={
                 'value': round(moving_avg, 2) if moving_avg is not None else None,
                 'raw_change_pct': round(recent_change, 2) if recent_change is not None else None,
                 'improvement_pct': round(-recent_change if is_time_metric and recent_change is not None
                                        else recent_change if recent_change is not None else 0.0, 2)
             },
-            'period_changes': period_changes,
-            'status': 'summarized',
-            'analyzed_at': datetime.now().isoformat()
-        }
+            period_changes=period_changes,
+            status='summarized',
+            analyzed_at=datetime.now().isoformat()
+        )
         
-        print(f"ANALYZER: Completed analysis for task ID {task_id}")
-        print(f"ANALYZER: Overall change: {improvement_pct:.2f}%, Trend: {trend['trend_description']}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Completed analysis for task ID %s", task_id)
+            logger.debug("Overall change: %.2f%%, Trend: %s", improvement_pct, trend['trend_description'])
         
         return summary
 
@@ -332,12 +1243,24 @@ if __name__ == '__main__':
     import json
     from summary_data import SummaryDataCollector
     
+    try:
+        import orjson
+    except ImportError:  # orjson is optional; fall back to the standard library
+        orjson = None
+    
+    def dump_analysis(analysis):
+        """Serialize an analysis to indented JSON bytes"""
+        if orjson is not None:
+            return orjson.dumps(dict(analysis), option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+        return json.dumps(analysis, indent=2, default=dict).encode()
+    
     parser = argparse.ArgumentParser(description='Analyze task performance data')
     parser.add_argument('--task-id', help='ID of task to analyze')
     parser.add_argument('--data-file', help='Path to JSON file with task data')
     parser.add_argument('--output-file', help='Path to save analysis results')
     args = parser.parse_args()
     
+    logging.basicConfig(level=logging.DEBUG, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
     analyzer = SummaryAnalyzer()
     
     # Get task data
@@ -355,11 +1278,11 @@ if __name__ == '__main__':
         
         # Save or print results
         if args.output_file:
-            with open(args.output_file, 'w') as f:
-                json.dump(analysis, f, indent=2)
+            with open(args.output_file, 'wb') as f:
+                f.write(dump_analysis(analysis))
             print(f"Analysis saved to {args.output_file}")
         else:
             print("\nAnalysis Results:")
-            print(json.dumps(analysis, indent=2))
+            print(dump_analysis(analysis).decode())
     else:
         print("No task data to analyze. Use --task-id or --data-file.")
\ No newline at end of file
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Ahead-of-time build of the SummaryAnalyzer numeric kernels.
+
+Compiles _linreg_core and _ttest_core from summary_analyzer.py into a native
+summary_kernels extension next to this file. summary_analyzer imports it when
+present, so short-lived runs (e.g. cron jobs) skip the numba JIT warm-up on the
+first analysis. The extension is platform specific and not checked in; build it
+as part of deployment:
+
+    python src/agents/maintenance/tracker/task_summary/summary_analyzer_cc.py
+"""
+import sys
+import os
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.insert(0, current_dir)
+
+from numba.pycc import CC
+
+# Import the JIT kernels even if an older build of the extension is present
+sys.modules['summary_kernels'] = None
+import summary_analyzer
+
+cc = CC('summary_kernels')
+cc.output_dir = current_dir
+cc.export('linreg_core', 'UniTuple(f8, 4)(f8[:], f8[:])')(summary_analyzer._linreg_core.py_func)
+cc.export('ttest_core', 'UniTuple(f8, 2)(f8[:], f8[:])')(summary_analyzer._ttest_core.py_func)
+
+
+if __name__ == '__main__':
+    cc.compile()
+    print(f"Built summary_kernels in {current_dir}")
@@ -1,9 +1,11 @@
 #!/usr/bin/env python3
 import sys
 import os
+import threading
+from collections import defaultdict
 from datetime import datetime
 from pathlib import Path
-from dotenv import load_dotenv
+from cachetools import TTLCache
 
 # Add project root to path
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -11,10 +13,45 @@ src_dir = os.path.abspath(os.path.join(current_dir, "../../../"))
 if src_dir not in sys.path:
     sys.path.insert(0, src_dir)
 
-# Load environment
-load_dotenv(Path(__file__).resolve().parents[3] / ".env.local")
+from shared_services.bootstrap import ensure_env_loaded
+from shared_services.concurrency import run_concurrently
+
+# Columns read by the analyzer and the summary writer; avoids fetching whole rows
+TASK_COLUMNS = ('id,title,issue_type,entity_id,entity_type,mechanic_name,'
+                'monitor_status,monitor_start_date,monitor_end_date,extension_count')
+MEASUREMENT_COLUMNS = 'measurement_date,value'
+# Saved regression state of each summary (see SummaryAnalyzer.analyze_task_data), read
+# out of metrics_json so the rest of the stored metrics is not transferred
+TREND_STATE_COLUMNS = 'id,task_id,summary_date,trend_state:metrics_json->trend_state'
+
+# Task IDs per IN (...) filter, keeps the request URL short
+ID_BATCH_SIZE = 100
+# Rows per request when paging bulk results (PostgREST caps responses at max-rows)
+PAGE_SIZE = 1000
+# ID batches fetched at the same time, to avoid overwhelming PostgREST
+MAX_CONCURRENT_BATCHES = 8
+
+# Task rows and evaluation lists shared by every collector in the process, so
+# repeated lookups during a run do not hit the database again. Callers get copies;
+# TaskUpdater clears both through SummaryDataCollector.clear_cache after task writes
+_task_cache = TTLCache(maxsize=512, ttl=60)
+_evaluation_cache = TTLCache(maxsize=8, ttl=60)
+
+# Database client shared by every collector in the process
+_client = None
+_client_lock = threading.Lock()
+
+
+def _get_client():
+    """Return the shared database client, loading the environment and connecting on first use"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            ensure_env_loaded(Path(__file__).resolve().parents[3] / ".env.local")
+            from shared_services.db_client import get_connection
+            _client = get_connection()
+        return _client
 
-from shared_services.db_client import get_connection
 
 class SummaryDataCollector:
     """
@@ -27,12 +64,28 @@ class SummaryDataCollector:
         
         try:
             # Connect to the database
-            self.supabase = get_connection()
+            self.supabase = _get_client()
             print("DATA: Connected to Supabase")
         except Exception as e:
             print(f"DATA: Error connecting to database: {e}")
             self.supabase = None
     
+    @classmethod
+    def close(cls):
+        """Release the shared database client; the next collector reconnects"""
+        global _client
+        with _client_lock:
+            if _client is not None:
+                from shared_services.db_client import release_connection
+                release_connection(_client)
+                _client = None
+    
+    @staticmethod
+    def clear_cache():
+        """Drop cached task rows and evaluation lists, e.g. after tasks were updated"""
+        _task_cache.clear()
+        _evaluation_cache.clear()
+    
     def get_all_measurements(self, task_id):
         """
         Get all measurements for a task in chronological order
@@ -49,7 +102,7 @@ class SummaryDataCollector:
             
         try:
             result = (self.supabase.table('measurements')
-                       .select('*')
+                       .select(MEASUREMENT_COLUMNS)
                        .eq('task_id', task_id)
                        .order('measurement_date')
                        .execute())
@@ -64,6 +117,70 @@ class SummaryDataCollector:
             print(f"DATA: Error retrieving measurements: {e}")
             return []
     
+    def get_recent_measurements(self, task_id, n):
+        """
+        Get the latest N measurements for a task, without pulling the full history
+        
+        Args:
+            task_id: ID of the task to get measurements for
+            n: Number of measurements to return
+            
+        Returns:
+            list: Up to n most recent measurement records in chronological order
+        """
+        if not self.supabase:
+            print("DATA: No database connection available")
+            return []
+            
+        try:
+            result = (self.supabase.table('measurements')
+                       .select(MEASUREMENT_COLUMNS)
+                       .eq('task_id', task_id)
+                       .order('measurement_date', desc=True)
+                       .limit(n)
+                       .execute())
+            
+            if result.data:
+                print(f"DATA: Retrieved {len(result.data)} recent measurements for task {task_id}")
+                return result.data[::-1]
+            
+            print(f"DATA: No measurements found for task {task_id}")
+            return []
+        except Exception as e:
+            print(f"DATA: Error retrieving recent measurements: {e}")
+            return []
+    
+    def get_baseline_measurement(self, task_id):
+        """
+        Get the first measurement for a task and the total number of measurements
+        
+        Args:
+            task_id: ID of the task to get the baseline for
+            
+        Returns:
+            tuple: (baseline measurement record or None, measurement count)
+        """
+        if not self.supabase:
+            print("DATA: No database connection available")
+            return None, 0
+            
+        try:
+            result = (self.supabase.table('measurements')
+                       .select(MEASUREMENT_COLUMNS, count='exact')
+                       .eq('task_id', task_id)
+                       .order('measurement_date')
+                       .limit(1)
+                       .execute())
+            
+            if result.data:
+                return result.data[0], result.count or 1
+            
+            print(f"DATA: No measurements found for task {task_id}")
+            return None, 0
+        except Exception as e:
+            print(f"DATA: Error retrieving baseline measurement: {e}")
+            return None, 0
+    
     def get_task_details(self, task_id):
         """
         Get detailed task information
@@ -74,19 +191,23 @@ class SummaryDataCollector:
         Returns:
             dict: Task details or None if not found
         """
+        if task_id in _task_cache:
+            return dict(_task_cache[task_id])
+        
         if not self.supabase:
             print("DATA: No database connection available")
             return None
             
         try:
             result = (self.supabase.table('tasks')
-                       .select('*')
+                       .select(TASK_COLUMNS)
                        .eq('id', task_id)
                        .execute())
             
             if result.data:
                 print(f"DATA: Retrieved task details for {task_id}")
-                return result.data[0]
+                _task_cache[task_id] = result.data[0]
+                return dict(result.data[0])
                 
             print(f"DATA: No task found with ID {task_id}")
             return None
@@ -101,6 +222,10 @@ class SummaryDataCollector:
         Returns:
             list: List of tasks ready for evaluation
         """
+        cache_key = self.today.isoformat()
+        if cache_key in _evaluation_cache:
+            return [dict(task) for task in _evaluation_cache[cache_key]]
+        
         if not self.supabase:
             print("DATA: No database connection available")
             return []
@@ -109,14 +234,16 @@ class SummaryDataCollector:
             # Get tasks where today is equal to or past the end date
             # and the status is still 'active'
             result = (self.supabase.table('tasks')
-                       .select('*')
+                       .select(TASK_COLUMNS)
                        .eq('monitor_status', 'active')
                        .lte('monitor_end_date', self.today.isoformat())
                        .execute())
             
             if result.data:
                 print(f"DATA: Found {len(result.data)} tasks ready for evaluation")
-                return result.data
+                _evaluation_cache[cache_key] = result.data
+                _task_cache.update((task['id'], task) for task in result.data)
+                return [dict(task) for task in result.data]
                 
             print("DATA: No tasks ready for evaluation")
             return []
@@ -138,7 +265,7 @@ class SummaryDataCollector:
         try:
             # Get tasks where needs_evaluation is True
             result = (self.supabase.table('tasks')
-                       .select('*')
+                       .select(TASK_COLUMNS)
                        .eq('needs_evaluation', True)
                        .execute())
             
@@ -152,31 +279,238 @@ class SummaryDataCollector:
             print(f"DATA: Error retrieving tasks marked for evaluation: {e}")
             return []
     
-    def collect_data_for_task(self, task_id):
+    def _select_in(self, table, columns, column, values, order=None):
         """
-        Collect all data needed for task evaluation
+        Select all rows of a table whose column is in values, batching the IN
+        filter and paging through the results
+        
+        Args:
+            table: Table to query
+            columns: Columns to select
+            column: Column to filter on
+            values: Values to match
+            order: Optional column to order the rows by; rows are then ordered by
+                their unique id, which the table must have
+            
+        Returns:
+            list: Matching rows, batch by batch in the order of values
+        """
+        values = list(values)
+        batches = [values[i:i + ID_BATCH_SIZE] for i in range(0, len(values), ID_BATCH_SIZE)]
+        
+        def select_batch(batch):
+            batch_rows = []
+            start = 0
+            while True:
+                query = self.supabase.table(table).select(columns).in_(column, batch)
+                if order:
+                    query = query.order(order)
+                # Unique tie-breaker: without it rows tied on order may move between
+                # requests, so offset pages could skip or repeat them
+                query = query.order('id')
+                page = query.range(start, start + PAGE_SIZE).execute().data or []
+                batch_rows.extend(page)
+                if len(page) < PAGE_SIZE:
+                    return batch_rows
+                start += PAGE_SIZE
+        
+        if len(batches) <= 1:
+            return select_batch(batches[0]) if batches else []
+        
+        # Fetch the batches concurrently
+        rows = []
+        for batch_rows in run_concurrently([lambda batch=batch: select_batch(batch) for batch in batches],
+                                           max_workers=MAX_CONCURRENT_BATCHES):
+            rows.extend(batch_rows)
+        return rows
+    
+    def get_trend_states(self, task_ids):
+        """
+        Get the regression state saved with the latest summary of several tasks,
+        so the analyzer only has to process measurements added since then
+        
+        Args:
+            task_ids: IDs of the tasks to get states for
+            
+        Returns:
+            dict: Task ID -> trend state, for tasks whose latest summary has one
+        """
+        if not self.supabase:
+            print("DATA: No database connection available")
+            return {}
+            
+        try:
+            rows = self._select_in('task_summaries', TREND_STATE_COLUMNS, 'task_id', task_ids,
+                                   order='summary_date')
+            # Rows are oldest first, so the last one seen per task is its latest summary
+            states = {row['task_id']: row.get('trend_state') for row in rows}
+            return {task_id: state for task_id, state in states.items() if state}
+        except Exception as e:
+            print(f"DATA: Error retrieving trend states: {e}")
+            return {}
+    
+    def get_measurements_for_tasks(self, task_ids):
+        """
+        Get the measurements of several tasks with one query
+        
+        Args:
+            task_ids: IDs of the tasks to get measurements for
+            
+        Returns:
+            dict: Task ID -> list of measurement records in chronological order
+        """
+        if not self.supabase:
+            print("DATA: No database connection available")
+            return {}
+            
+        try:
+            rows = self._select_in('measurements', f'id,task_id,{MEASUREMENT_COLUMNS}', 'task_id', task_ids,
+                                   order='measurement_date')
+            measurements = defaultdict(list)
+            for row in rows:
+                measurements[row['task_id']].append(row)
+            print(f"DATA: Retrieved {len(rows)} measurements for {len(measurements)} tasks")
+            return dict(measurements)
+        except Exception as e:
+            print(f"DATA: Error retrieving measurements: {e}")
+            return {}
+    
+    def get_tasks_details(self, task_ids):
+        """
+        Get task information for several tasks with one query
+        
+        Args:
+            task_ids: IDs of the tasks to get details for
+            
+        Returns:
+            dict: Task ID -> task details, for the tasks that were found
+        """
+        tasks = {task_id: dict(_task_cache[task_id]) for task_id in task_ids if task_id in _task_cache}
+        missing = [task_id for task_id in task_ids if task_id not in tasks]
+        if not missing:
+            return tasks
+        
+        if not self.supabase:
+            print("DATA: No database connection available")
+            return tasks
+            
+        try:
+            fetched = {task['id']: task for task in self._select_in('tasks', TASK_COLUMNS, 'id', missing)}
+            _task_cache.update(fetched)
+            tasks.update((task_id, dict(task)) for task_id, task in fetched.items())
+            print(f"DATA: Retrieved task details for {len(tasks)} of {len(task_ids)} tasks")
+            return tasks
+        except Exception as e:
+            print(f"DATA: Error retrieving task details: {e}")
+            return tasks
+    
+    def collect_data_for_tasks(self, task_ids):
+        """
+        Collect the data needed for evaluating several tasks, using one tasks query,
+        one measurements query and one trend state query (run concurrently) instead of
+        three per task
+        
+        Args:
+            task_ids: IDs of the tasks to collect data for
+            
+        Returns:
+            dict: Task ID -> dictionary with task details, measurements and, when a
+                  previous summary saved one, its 'trend_state'; tasks that were not
+                  found are left out
+        """
+        task_ids = list(dict.fromkeys(task_ids))
+        if not task_ids:
+            return {}
+        
+        tasks, measurements, trend_states = run_concurrently([
+            lambda: self.get_tasks_details(task_ids),
+            lambda: self.get_measurements_for_tasks(task_ids),
+            lambda: self.get_trend_states(task_ids),
+        ])
+        collected_at = datetime.now().isoformat()
+        
+        data = {}
+        for task_id in task_ids:
+            task = tasks.get(task_id)
+            if not task:
+                print(f"DATA: Could not find task {task_id}")
+                continue
+            data[task_id] = {
+                'task': task,
+                'measurements': measurements.get(task_id, []),
+                'collected_at': collected_at
+            }
+            if task_id in trend_states:
+                data[task_id]['trend_state'] = trend_states[task_id]
+        return data
+    
+    def collect_recent(self, task_id, window=3):
+        """
+        Collect the baseline and the latest measurements of a task, enough for the
+        overall change and moving average but not for trend or significance analysis
         
         Args:
             task_id: ID of the task to collect data for
+            window: Number of recent measurements to collect
             
         Returns:
-            dict: Dictionary with task details and measurements, or None if task not found
+            dict: Dictionary with task details, baseline, recent measurements and the
+                  total measurement count, or None if task not found
         """
-        # Get task details
-        task = self.get_task_details(task_id)
+        # The three lookups are independent, so they run concurrently
+        task, (baseline, count), measurements = run_concurrently([
+            lambda: self.get_task_details(task_id),
+            lambda: self.get_baseline_measurement(task_id),
+            lambda: self.get_recent_measurements(task_id, window),
+        ])
         if not task:
             print(f"DATA: Could not find task {task_id}")
             return None
         
-        # Get measurements
-        measurements = self.get_all_measurements(task_id)
+        return {
+            'task': task,
+            'baseline': baseline,
+            'measurements': measurements,
+            'measurements_count': count,
+            'collected_at': datetime.now().isoformat()
+        }
+    
+    def collect_data_for_task(self, task_id, full_history=True, window=3):
+        """
+        Collect all data needed for task evaluation
+        
+        Args:
+            task_id: ID of the task to collect data for
+            full_history: Fetch every measurement (needed for trend and significance
+                          analysis); otherwise only the baseline and the latest window
+            window: Number of recent measurements to collect when full_history is False
+            
+        Returns:
+            dict: Dictionary with task details, measurements and the latest saved
+                  'trend_state' if any, or None if task not found
+        """
+        if not full_history:
+            return self.collect_recent(task_id, window)
+        
+        # Get task details, measurements and the saved trend state concurrently
+        task, measurements, trend_states = run_concurrently([
+            lambda: self.get_task_details(task_id),
+            lambda: self.get_all_measurements(task_id),
+            lambda: self.get_trend_states([task_id]),
+        ])
+        if not task:
+            print(f"DATA: Could not find task {task_id}")
+            return None
         
         # Return combined data
-        return {
+        data = {
             'task': task,
             'measurements': measurements,
             'collected_at': datetime.now().isoformat()
         }
+        if task_id in trend_states:
+            data['trend_state'] = trend_states[task_id]
+        return data
 
 
 # For testing this module directly
@@ -2,9 +2,23 @@
 import sys
 import os
 import json
-from datetime import datetime
+import logging
+import math
+from datetime import date, datetime
+from dataclasses import dataclass
+from decimal import Decimal
+from functools import cached_property
+from operator import itemgetter
 from pathlib import Path
-from dotenv import load_dotenv
+from types import SimpleNamespace
+from cachetools import LRUCache
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; metrics_json text is then decoded with the standard library
+    orjson = None
+
+logger = logging.getLogger("summary_writer")
 
 # Add project root to path
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -12,26 +26,265 @@ src_dir = os.path.abspath(os.path.join(current_dir, "../../../"))
 if src_dir not in sys.path:
     sys.path.insert(0, src_dir)
 
-# Load environment
-load_dotenv(Path(__file__).resolve().parents[3] / ".env.local")
+from shared_services.bootstrap import ensure_env_loaded
+
+def _get_connection():
+    """Load the environment on first database use, then return the shared database client"""
+    ensure_env_loaded(Path(__file__).resolve().parents[3] / ".env.local")
+    from shared_services.db_client import get_connection
+    return get_connection()
+
+# Metrics of recently saved summaries by summary ID, shared by every writer in the
+# process, so evaluating a summary right after saving it needs no fetch or JSON parse
+_saved_metrics = LRUCache(maxsize=256)
+
+def get_saved_metrics(summary_id):
+    """
+    Get the metrics of a summary saved by this process, without a database fetch
+    
+    Args:
+        summary_id: ID of the summary
+        
+    Returns:
+        dict: Copy of the metrics stored in metrics_json, or None if not cached
+    """
+    metrics = _saved_metrics.get(summary_id)
+    return dict(metrics) if metrics is not None else None
+
+def _jsonb_value(value):
+    """
+    Convert metrics to plain JSON types for the jsonb metrics_json column
+    
+    The record is encoded by the Supabase client with the standard json module, so
+    NaN/infinity (invalid JSON) become null, and numpy, Decimal and date values are
+    converted here.
+    
+    Args:
+        value: Metrics dict or any value nested in it
+        
+    Returns:
+        The value built from dict, list, str, int, float, bool and None only
+    """
+    if isinstance(value, dict):
+        return {str(k): _jsonb_value(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonb_value(v) for v in value]
+    if isinstance(value, float):
+        return float(value) if math.isfinite(value) else None
+    if value is None or isinstance(value, (str, int, bool)):
+        return value
+    if isinstance(value, Decimal):
+        return _jsonb_value(float(value))
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if hasattr(value, 'tolist'):
+        # numpy scalars and arrays
+        return _jsonb_value(value.tolist())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+# Required overall_metrics values, fetched together for the float columns
+_overall_values = itemgetter('baseline_value', 'latest_value', 'raw_change_pct', 'improvement_pct')
+
+def _optional_float(value):
+    """Convert a metric to float for a numeric column, keeping None"""
+    return None if value is None else float(value)
+
+def execute_write(query):
+    """
+    Execute a PostgREST insert/update, encoding the request body with orjson
+    
+    orjson produces the UTF-8 body bytes in one pass, where the client would build a
+    str with the json module and encode it again. Without orjson the query runs as usual.
+    
+    Args:
+        query: Insert or update query built from a Supabase table, not yet executed
+        
+    Returns:
+        The query result; its data holds the rows returned by the database
+        
+    Raises:
+        httpx.HTTPStatusError: If the database rejected the write
+    """
+    if orjson is None:
+        return query.execute()
+    
+    # httpx only sets the JSON content type itself for json= bodies
+    headers = query.headers.copy()
+    headers['Content-Type'] = 'application/json'
+    response = query.session.request(
+        query.http_method,
+        query.path,
+        content=orjson.dumps(query.json, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY),
+        params=query.params,
+        headers=headers,
+    )
+    response.raise_for_status()
+    return SimpleNamespace(data=orjson.loads(response.content) if response.content else [])
+
+def loads_metrics(metrics_json):
+    """
+    Decode a metrics_json value
+    
+    Args:
+        metrics_json: The metrics_json column value; a dict for jsonb objects, or JSON
+            text (str or bytes) for summaries saved as encoded strings
+        
+    Returns:
+        dict: The decoded metrics
+        
+    Raises:
+        json.JSONDecodeError: If the value is not valid JSON (orjson's error subclasses it)
+    """
+    if isinstance(metrics_json, dict):
+        return metrics_json
+    if orjson is not None:
+        return orjson.loads(metrics_json)
+    return json.loads(metrics_json)
 
-from shared_services.db_client import get_connection
+@dataclass(slots=True)
+class SummaryRecord:
+    """
+    Row of the task_summaries table. Fields are stored in slots rather than a
+    per-instance dict; to_dict() gives the plain dict sent to the database.
+    """
+    task_id: object
+    summary_date: str
+    is_final: bool
+    extension_number: int
+    period_start: object
+    period_end: object
+    measurements_count: int
+    baseline_value: float
+    latest_value: float
+    raw_change_pct: float
+    improvement_pct: float
+    is_improved: bool
+    trend_description: str
+    is_statistically_significant: bool
+    recommendation: str
+    trend_slope: float = None
+    trend_r_squared: float = None
+    trend_p_value: float = None
+    confidence_level: float = None
+    metrics_json: dict = None
+    
+    def to_dict(self):
+        """Convert to a plain dict (values are not copied)"""
+        return {name: getattr(self, name) for name in self.__slots__}
 
 class SummaryWriter:
     """
     Handles saving performance summary data to the database.
     """
-    def __init__(self):
-        self.today = datetime.now().date()
-        print(f"WRITER: Initializing for {self.today}")
+    def __init__(self, supabase=None):
+        """
+        Args:
+            supabase: Existing database client to share; a connection is obtained on
+                first database use when omitted
+        """
+        self.refresh_today()
+        logger.debug("Initializing for %s", self.today)
         
+        if supabase is not None:
+            self.supabase = supabase
+    
+    def refresh_today(self):
+        """Set today's date, for long-running processes that cross midnight"""
+        self.today = datetime.now().date()
+        self.today_iso = self.today.isoformat()
+    
+    @cached_property
+    def supabase(self):
+        """Database client, connected on first access; None if the connection failed"""
         try:
-            # Connect to the database
-            self.supabase = get_connection()
-            print("WRITER: Connected to Supabase")
+            supabase = _get_connection()
+            logger.debug("Connected to Supabase")
+            return supabase
         except Exception as e:
-            print(f"WRITER: Error connecting to database: {e}")
-            self.supabase = None
+            logger.error("Error connecting to database: %s", e)
+            return None
+    
+    def build_summary_record(self, summary, task):
+        """
+        Build the task_summaries row for a performance summary
+        
+        Args:
+            summary: The analysis summary to save
+            task: The original task object
+            
+        Returns:
+            tuple: (SummaryRecord, metrics dict stored in its metrics_json)
+        """
+        # Determine if this is an insufficient data case
+        is_insufficient = summary.get('status') == 'insufficient_data'
+        
+        # Get task details
+        task_id = summary.get('task_id')
+        extension_number = task.get('extension_count', 0)
+        is_final = True  # Assume it's final unless extended later
+        
+        # Build the record for the data status
+        if is_insufficient:
+            # Minimal record for insufficient data
+            metrics = {
+                'task_id': task_id,
+                'status': 'insufficient_data',
+                'message': summary.get('message', 'Insufficient data')
+            }
+            summary_record = SummaryRecord(
+                task_id=task_id,
+                summary_date=self.today_iso,
+                is_final=is_final,
+                extension_number=extension_number,
+                period_start=task.get('monitor_start_date'),
+                period_end=task.get('monitor_end_date'),
+                measurements_count=0,
+                baseline_value=0,
+                latest_value=0,
+                raw_change_pct=0,
+                improvement_pct=0,
+                is_improved=False,
+                trend_description="Insufficient data for analysis",
+                is_statistically_significant=False,
+                recommendation='review'
+            )
+        else:
+            # Complete record for full analysis
+            metrics = dict(summary)
+            period = summary['monitoring_period']
+            overall = summary['overall_metrics']
+            trend = summary['trend_analysis']
+            significance = summary['significance_test']
+            baseline_value, latest_value, raw_change_pct, improvement_pct = map(float, _overall_values(overall))
+            trend_slope, trend_r_squared, trend_p_value, confidence_level = map(_optional_float, (
+                trend.get('slope'), trend.get('r_squared'), trend.get('p_value'), significance.get('confidence')))
+            summary_record = SummaryRecord(
+                task_id=task_id,
+                summary_date=self.today_iso,
+                is_final=is_final,
+                extension_number=extension_number,
+                period_start=period['start'],
+                period_end=period['end'],
+                measurements_count=summary['measurements_count'],
+                baseline_value=baseline_value,
+                latest_value=latest_value,
+                raw_change_pct=raw_change_pct,
+                improvement_pct=improvement_pct,
+                is_improved=bool(overall['improved']),
+                trend_slope=trend_slope,
+                trend_r_squared=trend_r_squared,
+                trend_p_value=trend_p_value,
+                trend_description=trend.get('trend_description'),
+                is_statistically_significant=bool(significance.get('is_significant', False)),
+                confidence_level=confidence_level,
+                recommendation=''  # No recommendation - that comes from evaluator
+            )
+        
+        # Store the full analysis as a jsonb object, encoded once with the record
+        metrics = _jsonb_value(metrics)
+        summary_record.metrics_json = metrics
+        
+        return summary_record, metrics
     
     def save_summary(self, summary, task):
         """
@@ -45,85 +298,69 @@ class SummaryWriter:
             dict: The saved summary record with ID or None if failed
         """
         if not self.supabase:
-            print("WRITER: No database connection available")
+            logger.warning("No database connection available")
             return None
             
         try:
-            # Determine if this is an insufficient data case
-            is_insufficient = summary.get('status') == 'insufficient_data'
-            
-            # Get task details
-            task_id = summary.get('task_id')
-            extension_number = task.get('extension_count', 0)
-            is_final = True  # Assume it's final unless extended later
-            
-            # Prepare common fields for summary record
-            summary_record = {
-                'task_id': task_id,
-                'summary_date': self.today.isoformat(),
-                'is_final': is_final,
-                'extension_number': extension_number
-            }
-            
-            # Add fields specific to the data status
-            if is_insufficient:
-                # Minimal record for insufficient data
-                summary_record.update({
-                    'period_start': task.get('monitor_start_date'),
-                    'period_end': task.get('monitor_end_date'),
-                    'measurements_count': 0,
-                    'baseline_value': 0,
-                    'latest_value': 0,
-                    'raw_change_pct': 0,
-                    'improvement_pct': 0,
-                    'is_improved': False,
-                    'trend_description': "Insufficient data for analysis",
-                    'is_statistically_significant': False,
-                    'recommendation': 'review',
-                    'metrics_json': json.dumps({
-                        'task_id': task_id,
-                        'status': 'insufficient_data',
-                        'message': summary.get('message', 'Insufficient data')
-                    })
-                })
-            else:
-                # Complete record for full analysis
-                summary_record.update({
-                    'period_start': summary['monitoring_period']['start'],
-                    'period_end': summary['monitoring_period']['end'],
-                    'measurements_count': summary['measurements_count'],
-                    'baseline_value': float(summary['overall_metrics']['baseline_value']),
-                    'latest_value': float(summary['overall_metrics']['latest_value']),
-                    'raw_change_pct': float(summary['overall_metrics']['raw_change_pct']),
-                    'improvement_pct': float(summary['overall_metrics']['improvement_pct']),
-                    'is_improved': bool(summary['overall_metrics']['improved']),
-                    'trend_slope': None if summary['trend_analysis'].get('slope') is None else float(summary['trend_analysis']['slope']),
-                    'trend_r_squared': None if summary['trend_analysis'].get('r_squared') is None else float(summary['trend_analysis']['r_squared']),
-                    'trend_p_value': None if summary['trend_analysis'].get('p_value') is None else float(summary['trend_analysis']['p_value']),
-                    'trend_description': summary['trend_analysis'].get('trend_description'),
-                    'is_statistically_significant': bool(summary['significance_test'].get('is_significant', False)),
-                    'confidence_level': None if summary['significance_test'].get('confidence') is None else float(summary['significance_test']['confidence']),
-                    'recommendation': '',  # No recommendation - that comes from evaluator
-                    'metrics_json': json.dumps(summary)  # Store the full analysis as JSON
-                })
+            summary_record, metrics = self.build_summary_record(summary, task)
             
             # Insert the record
-            result = self.supabase.table('task_summaries').insert(summary_record).execute()
+            result = execute_write(self.supabase.table('task_summaries').insert(summary_record.to_dict()))
             
             if result.data:
                 summary_id = result.data[0]['id']
-                print(f"WRITER: Successfully saved summary to database with ID {summary_id}")
+                logger.debug("Saved summary to database with ID %s", summary_id)
+                _saved_metrics[summary_id] = metrics
                 # Add the ID to the returned summary
                 summary['summary_id'] = summary_id
                 return result.data[0]
             else:
-                print(f"WRITER: Failed to save summary to database")
+                logger.warning("Failed to save summary to database")
                 return None
                 
         except Exception as e:
-            print(f"WRITER: Error saving summary to database: {e}")
+            logger.error("Error saving summary to database: %s", e)
             return None
     
+    def save_summaries(self, summaries_and_tasks):
+        """
+        Save several performance summaries with a single insert
+        
+        Args:
+            summaries_and_tasks: (summary, task) pairs to save
+            
+        Returns:
+            list: The saved summary records with IDs, in input order, or empty if failed
+        """
+        if not summaries_and_tasks:
+            return []
+            
+        if not self.supabase:
+            logger.warning("No database connection available")
+            return []
+            
+        try:
+            built = [self.build_summary_record(summary, task) for summary, task in summaries_and_tasks]
+            
+            # Insert all records
+            result = execute_write(self.supabase.table('task_summaries')
+                                   .insert([summary_record.to_dict() for summary_record, _ in built]))
+            
+            if result.data:
+                # Rows come back in insert order
+                for (summary, _), (_, metrics), saved in zip(summaries_and_tasks, built, result.data):
+                    _saved_metrics[saved['id']] = metrics
+                    summary['summary_id'] = saved['id']
+                logger.info("Saved %d summaries to database", len(result.data))
+                return result.data
+            else:
+                logger.warning("Failed to save summaries to database")
+                return []
+                
+        except Exception as e:
+            logger.error("Error saving summaries to database: %s", e)
+            return []
+    
     def update_summary_status(self, summary_id, is_final):
         """
         Update the is_final flag on a summary record
@@ -133,29 +370,58 @@ class SummaryWriter:
             summary_id: ID of summary to update
             is_final: New value for is_final flag
             
+        Returns:
+            bool: True if update succeeded, False otherwise
+        """
+        return self.update_summary_status_bulk([summary_id], is_final)
+    
+    def update_summary_status_bulk(self, summary_ids, is_final):
+        """
+        Update the is_final flag on several summary records with a single update
+        
+        Args:
+            summary_ids: IDs of summaries to update
+            is_final: New value for is_final flag
+            
         Returns:
             bool: True if update succeeded, False otherwise
         """
         if not self.supabase:
-            print("WRITER: No database connection available")
+            logger.warning("No database connection available")
             return False
             
+        summary_ids = list(summary_ids)
+        if not summary_ids:
+            return True
+            
         try:
             result = (self.supabase.table('task_summaries')
                        .update({'is_final': is_final})
-                       .eq('id', summary_id)
+                       .in_('id', summary_ids)
                        .execute())
             
             if result.data:
-                print(f"WRITER: Updated summary {summary_id} is_final = {is_final}")
+                logger.info("Updated %d summaries is_final = %s", len(result.data), is_final)
                 return True
             else:
-                print(f"WRITER: Failed to update summary {summary_id}")
+                logger.warning("Failed to update summaries %s", summary_ids)
                 return False
         except Exception as e:
-            print(f"WRITER: Error updating summary: {e}")
+            logger.error("Error updating summary: %s", e)
             return False
     
+    def get_saved_metrics(self, summary_id):
+        """
+        Get the metrics of a summary saved by this process, without a database fetch
+        
+        Args:
+            summary_id: ID of the summary
+            
+        Returns:
+            dict: Copy of the metrics stored in metrics_json, or None if not cached
+        """
+        return get_saved_metrics(summary_id)
+    
     def get_summary_by_id(self, summary_id):
         """
         Retrieve a summary by its ID
@@ -167,7 +433,7 @@ class SummaryWriter:
             dict: The summary record or None if not found
         """
         if not self.supabase:
-            print("WRITER: No database connection available")
+            logger.warning("No database connection available")
             return None
             
         try:
@@ -179,12 +445,39 @@ class SummaryWriter:
             if result.data:
                 return result.data[0]
             else:
-                print(f"WRITER: No summary found with ID {summary_id}")
+                logger.debug("No summary found with ID %s", summary_id)
                 return None
         except Exception as e:
-            print(f"WRITER: Error retrieving summary: {e}")
+            logger.error("Error retrieving summary: %s", e)
             return None
     
+    def get_summaries_by_ids(self, summary_ids):
+        """
+        Retrieve several summaries with a single query
+        
+        Args:
+            summary_ids: IDs of the summaries to retrieve
+            
+        Returns:
+            list: The summary records found, empty if none or failed
+        """
+        if not self.supabase:
+            logger.warning("No database connection available")
+            return []
+            
+        if not summary_ids:
+            return []
+            
+        try:
+            result = (self.supabase.table('task_summaries')
+                       .select('*')
+                       .in_('id', list(summary_ids))
+                       .execute())
+            return result.data or []
+        except Exception as e:
+            logger.error("Error retrieving summaries: %s", e)
+            return []
+    
     def get_latest_summary_for_task(self, task_id):
         """
         Get the most recent summary for a task
@@ -196,7 +489,7 @@ class SummaryWriter:
             dict: The most recent summary or None if not found
         """
         if not self.supabase:
-            print("WRITER: No database connection available")
+            logger.warning("No database connection available")
             return None
             
         try:
@@ -210,10 +503,10 @@ class SummaryWriter:
             if result.data:
                 return result.data[0]
             else:
-                print(f"WRITER: No summaries found for task {task_id}")
+                logger.debug("No summaries found for task %s", task_id)
                 return None
         except Exception as e:
-            print(f"WRITER: Error retrieving latest summary: {e}")
+            logger.error("Error retrieving latest summary: %s", e)
             return None
 
 
@@ -230,6 +523,8 @@ if __name__ == '__main__':
     parser.add_argument('--get-latest', help='Get latest summary for task ID')
     args = parser.parse_args()
     
+    logging.basicConfig(level=logging.DEBUG, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+    
     writer = SummaryWriter()
     
     if args.get_summary:
@@ -282,15 +577,13 @@ if __name__ == '__main__':
             if saved_summary:
                 print(f"Summary saved to database with ID {saved_summary['id']}")
                 
-                # Get the saved summary
-                retrieved = writer.get_summary_by_id(saved_summary['id'])
-                if retrieved:
-                    print("\nRetrieved saved summary:")
-                    print(f"- ID: {retrieved['id']}")
-                    print(f"- Task ID: {retrieved['task_id']}")
-                    print(f"- Date: {retrieved['summary_date']}")
-                    print(f"- Measurements: {retrieved['measurements_count']}")
-                    print(f"- Improvement: {retrieved['improvement_pct']}%")
+                # The insert returns the saved row, so no need to read it back
+                print("\nSaved summary:")
+                print(f"- ID: {saved_summary['id']}")
+                print(f"- Task ID: {saved_summary['task_id']}")
+                print(f"- Date: {saved_summary['summary_date']}")
+                print(f"- Measurements: {saved_summary['measurements_count']}")
+                print(f"- Improvement: {saved_summary['improvement_pct']}%")
             else:
                 print("Failed to save summary to database")
         else:
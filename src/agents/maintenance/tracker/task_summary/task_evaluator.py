@@ -2,9 +2,13 @@
 import sys
 import os
 import json
+import logging
+from collections import Counter
+from functools import cached_property, lru_cache
 from datetime import datetime
 from pathlib import Path
-from dotenv import load_dotenv
+
+logger = logging.getLogger("task_evaluator")
 
 # Add project root to path
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -12,32 +16,109 @@ src_dir = os.path.abspath(os.path.join(current_dir, "../../../"))
 if src_dir not in sys.path:
     sys.path.insert(0, src_dir)
 
-# Load environment
-load_dotenv(Path(__file__).resolve().parents[3] / ".env.local")
+from shared_services.bootstrap import ensure_env_loaded
+from shared_services.concurrency import run_concurrently
+from src.agents.maintenance.tracker.task_summary.summary_writer import execute_write, get_saved_metrics, loads_metrics
+
+def _get_connection():
+    """Load the environment on first database use, then return the shared database client"""
+    ensure_env_loaded(Path(__file__).resolve().parents[3] / ".env.local")
+    from shared_services.db_client import get_connection
+    return get_connection()
 
-from shared_services.db_client import get_connection
-from src.agents.maintenance.tracker.task_summary.summary_writer import SummaryWriter
+# Decision rules as (action, confidence, explanation template, recommendation)
+_CLOSE_SIGNIFICANT = ("close", "high",
+                      "Performance has improved by {improvement_pct}% with statistical significance and shows a positive trend.",
+                      "Close this task as performance has met the improvement threshold with statistical confidence.")
+_CLOSE = ("close", "medium",
+          "Performance has improved by {improvement_pct}% and shows a positive trend, though not statistically significant.",
+          "Close this task but schedule a follow-up review in 30 days to confirm sustained improvement.")
+_EXTEND = ("extend", "medium",
+           "Some improvement ({improvement_pct}%) but more monitoring needed to confirm trend.",
+           "Extend monitoring for an additional period to confirm sustainable improvement.")
+_REVIEW = ("review", "medium",
+           "Minimal improvement ({improvement_pct}%) requires manager review.",
+           "Have a manager review the performance data and decide next steps.")
+_INTERVENE = ("intervene", "high",
+              "Performance is deteriorating by {abs_improvement_pct}%.",
+              "Immediate intervention required to address performance issues.")
+
+# Rule for each improvement band (<=0, >0, >=5, >=10, >=15 percent) and trend flags,
+# indexed by band * 4 + is_improving * 2 + is_significant
+DECISION_TABLE = (
+    _INTERVENE, _INTERVENE, _INTERVENE, _INTERVENE,
+    _REVIEW, _REVIEW, _REVIEW, _REVIEW,
+    _REVIEW, _REVIEW, _EXTEND, _EXTEND,
+    _REVIEW, _REVIEW, _CLOSE, _CLOSE,
+    _REVIEW, _REVIEW, _CLOSE, _CLOSE_SIGNIFICANT,
+)
+
+@lru_cache(maxsize=1024, typed=True)
+def _decide(improvement_pct, is_improving, is_significant):
+    """
+    Apply the decision rules to one combination of inputs, memoized because many
+    summaries in a run share the same (already rounded) improvement and trend flags.
+    Typed, so 15 and 15.0 keep their own explanation text.
+    
+    Args:
+        improvement_pct: Normalized improvement percentage
+        is_improving: Whether the trend is improving
+        is_significant: Whether the change is statistically significant
+        
+    Returns:
+        tuple: (key, value) pairs of the decision; callers build their own dict from it
+    """
+    # Look up the rule for the improvement band and trend flags
+    band = (improvement_pct > 0) + (improvement_pct >= 5) + (improvement_pct >= 10) + (improvement_pct >= 15)
+    action, confidence, explanation, recommendation = DECISION_TABLE[band * 4 + is_improving * 2 + is_significant]
+    
+    return (
+        ('action', action),
+        ('confidence', confidence),
+        ('explanation', explanation.format_map({'improvement_pct': improvement_pct,
+                                                'abs_improvement_pct': abs(improvement_pct)})),
+        ('recommendation', recommendation)
+    )
+
+# View listing summaries that have no task_evaluations row, and rows read per request
+UNEVALUATED_VIEW = 'v_unevaluated_summaries'
+UNEVALUATED_PAGE_SIZE = 1000
+
+# Cap on summaries evaluated concurrently by ID, well below Supabase's connection limit
+MAX_CONCURRENT_EVALUATIONS = 10
 
 class TaskEvaluator:
     """
     Task Evaluator component
     Takes performance summaries and makes rule-based decisions on next steps
     """
-    def __init__(self):
-        self.today = datetime.now().date()
-        print(f"EVALUATOR: Initializing for {self.today}")
+    def __init__(self, supabase=None):
+        """
+        Args:
+            supabase: Existing database client to share; a connection is obtained on
+                first database use when omitted
+        """
+        self.refresh_today()
+        logger.debug("Initializing for %s", self.today)
         
+        if supabase is not None:
+            self.supabase = supabase
+    
+    def refresh_today(self):
+        """Set today's date, for long-running processes that cross midnight"""
+        self.today = datetime.now().date()
+        self.today_iso = self.today.isoformat()
+    
+    @cached_property
+    def supabase(self):
+        """Database client, connected on first access; None if the connection failed"""
         try:
-            # Connect to the database
-            self.supabase = get_connection()
-            print("EVALUATOR: Connected to Supabase")
-            
-            # Initialize summary writer for retrieving summaries
-            self.summary_writer = SummaryWriter()
+            supabase = _get_connection()
+            logger.debug("Connected to Supabase")
+            return supabase
         except Exception as e:
-            print(f"EVALUATOR: Error initializing: {e}")
-            self.supabase = None
-            self.summary_writer = None
+            logger.error("Error connecting to database: %s", e)
+            return None
     
     def make_decision(self, summary):
         """
@@ -56,39 +137,7 @@ class TaskEvaluator:
         is_improving = summary.get('trend_analysis', {}).get('is_improving', False)
         is_significant = summary.get('significance_test', {}).get('is_significant', False)
         
-        # Determine action based on rules
-        if improvement_pct >= 15 and is_improving and is_significant:
-            action = "close"
-            confidence = "high"
-            explanation = f"Performance has improved by {improvement_pct}% with statistical significance and shows a positive trend."
-            recommendation = "Close this task as performance has met the improvement threshold with statistical confidence."
-        elif improvement_pct >= 10 and is_improving:
-            action = "close"
-            confidence = "medium"
-            explanation = f"Performance has improved by {improvement_pct}% and shows a positive trend, though not statistically significant."
-            recommendation = "Close this task but schedule a follow-up review in 30 days to confirm sustained improvement."
-        elif improvement_pct >= 5 and is_improving:
-            action = "extend"
-            confidence = "medium"
-            explanation = f"Some improvement ({improvement_pct}%) but more monitoring needed to confirm trend."
-            recommendation = "Extend monitoring for an additional period to confirm sustainable improvement."
-        elif improvement_pct > 0:
-            action = "review"
-            confidence = "medium"
-            explanation = f"Minimal improvement ({improvement_pct}%) requires manager review."
-            recommendation = "Have a manager review the performance data and decide next steps."
-        else:
-            action = "intervene"
-            confidence = "high"
-            explanation = f"Performance is deteriorating by {abs(improvement_pct)}%."
-            recommendation = "Immediate intervention required to address performance issues."
-        
-        return {
-            'action': action,
-            'confidence': confidence,
-            'explanation': explanation,
-            'recommendation': recommendation
-        }
+        return dict(_decide(improvement_pct, bool(is_improving), bool(is_significant)))
     
     def evaluate_summary(self, summary):
         """
@@ -102,11 +151,11 @@ class TaskEvaluator:
         """
         task_id = summary.get('task_id')
         summary_id = summary.get('summary_id')
-        print(f"EVALUATOR: Evaluating summary {summary_id} for task {task_id}")
+        logger.debug("Evaluating summary %s for task %s", summary_id, task_id)
         
         # If not enough data, return a default recommendation
         if summary.get('status') == 'insufficient_data':
-            print(f"EVALUATOR: Insufficient data for task ID {task_id}")
+            logger.debug("Insufficient data for task ID %s", task_id)
             return {
                 'task_id': task_id,
                 'summary_id': summary_id,
@@ -128,9 +177,29 @@ class TaskEvaluator:
             'decision': decision
         }
         
-        print(f"EVALUATOR: Recommended action for task {task_id}: {decision['action']} with {decision['confidence']} confidence")
+        logger.debug("Recommended action for task %s: %s with %s confidence", task_id, decision['action'], decision['confidence'])
         return evaluation
     
+    def build_evaluation_record(self, evaluation):
+        """
+        Build the task_evaluations row for an evaluation
+        
+        Args:
+            evaluation: The evaluation result
+            
+        Returns:
+            dict: The record to insert
+        """
+        return {
+            'task_id': evaluation['task_id'],
+            'summary_id': evaluation['summary_id'],
+            'decision': evaluation['decision']['action'],
+            'confidence': evaluation['decision']['confidence'],
+            'explanation': evaluation['decision']['explanation'],
+            'recommendation': evaluation['decision']['recommendation'],
+            'evaluation_date': self.today_iso
+        }
+    
     def save_evaluation(self, evaluation):
         """
         Save evaluation to the database
@@ -142,37 +211,109 @@ class TaskEvaluator:
             dict: The saved evaluation record or None if failed
         """
         if not self.supabase:
-            print("EVALUATOR: No database connection available")
+            logger.warning("No database connection available")
             return None
             
         try:
             # Prepare the evaluation record
-            evaluation_record = {
-                'task_id': evaluation['task_id'],
-                'summary_id': evaluation['summary_id'],
-                'decision': evaluation['decision']['action'],
-                'confidence': evaluation['decision']['confidence'],
-                'explanation': evaluation['decision']['explanation'],
-                'recommendation': evaluation['decision']['recommendation'],
-                'evaluation_date': self.today.isoformat()
-            }
+            evaluation_record = self.build_evaluation_record(evaluation)
             
             # Insert the record
-            result = self.supabase.table('task_evaluations').insert(evaluation_record).execute()
+            result = execute_write(self.supabase.table('task_evaluations').insert(evaluation_record))
             
             if result.data:
                 evaluation_id = result.data[0]['id']
-                print(f"EVALUATOR: Saved evaluation to database with ID {evaluation_id}")
+                logger.debug("Saved evaluation to database with ID %s", evaluation_id)
                 evaluation['evaluation_id'] = evaluation_id
                 return result.data[0]
             else:
-                print(f"EVALUATOR: Failed to save evaluation to database")
+                logger.warning("Failed to save evaluation to database")
                 return None
                 
         except Exception as e:
-            print(f"EVALUATOR: Error saving evaluation to database: {e}")
+            logger.error("Error saving evaluation to database: %s", e)
+            return None
+    
+    def save_evaluations(self, evaluations):
+        """
+        Save several evaluations to the database with a single insert
+        
+        Args:
+            evaluations: The evaluation results to save; each gets its evaluation_id set
+            
+        Returns:
+            list: The saved evaluation records, empty if failed
+        """
+        if not evaluations:
+            return []
+            
+        if not self.supabase:
+            logger.warning("No database connection available")
+            return []
+            
+        try:
+            records = [self.build_evaluation_record(evaluation) for evaluation in evaluations]
+            result = execute_write(self.supabase.table('task_evaluations').insert(records))
+            
+            if result.data:
+                # Rows come back in insert order
+                for evaluation, saved in zip(evaluations, result.data):
+                    evaluation['evaluation_id'] = saved['id']
+                logger.info("Saved %d evaluations to database", len(result.data))
+                return result.data
+            else:
+                logger.warning("Failed to save evaluations to database")
+                return []
+                
+        except Exception as e:
+            logger.error("Error saving evaluations to database: %s", e)
+            return []
+    
+    def get_summary_metrics(self, summary_id):
+        """
+        Retrieve the metrics of a summary by its ID
+        
+        Args:
+            summary_id: ID of the summary to retrieve
+            
+        Returns:
+            dict: Record with id and metrics_json, or None if not found
+        """
+        try:
+            result = (self.supabase.table('task_summaries')
+                       .select('id,metrics_json')
+                       .eq('id', summary_id)
+                       .limit(1)
+                       .execute())
+            return result.data[0] if result.data else None
+        except Exception as e:
+            logger.error("Error retrieving summary: %s", e)
             return None
     
+    def evaluate_summaries(self, summaries):
+        """
+        Evaluate summaries already in memory and save the evaluations with one insert
+        
+        Use this right after saving summaries: each carries its summary_id, so nothing
+        is read back from the database.
+        
+        Args:
+            summaries: Performance summaries, each with the summary_id it was saved under
+            
+        Returns:
+            list: List of evaluation results
+        """
+        evaluations = [self.evaluate_summary(summary) for summary in summaries]
+        if evaluations and logger.isEnabledFor(logging.INFO):
+            actions = Counter(evaluation['decision']['action'] for evaluation in evaluations)
+            logger.info("Evaluated %d summaries: %s", len(evaluations),
+                        ", ".join(f"{action} {count}" for action, count in actions.items()))
+        
+        # Save all evaluations in one insert
+        self.save_evaluations(evaluations)
+        
+        return evaluations
+    
     def evaluate_summary_by_id(self, summary_id):
         """
         Evaluate a summary by its ID
@@ -183,25 +324,30 @@ class TaskEvaluator:
         Returns:
             dict: The evaluation result or None if failed
         """
-        if not self.summary_writer:
-            print("EVALUATOR: Summary writer not available")
-            return None
-            
-        # Get the summary from the database
-        summary = self.summary_writer.get_summary_by_id(summary_id)
-        if not summary:
-            print(f"EVALUATOR: No summary found with ID {summary_id}")
+        if not self.supabase:
+            logger.warning("No database connection available")
             return None
             
-        # Extract the metrics_json field and parse it
-        metrics_json = summary.get('metrics_json')
-        if not metrics_json:
-            print(f"EVALUATOR: No metrics data in summary {summary_id}")
-            return None
+        # Summaries saved earlier in this run are reused as-is, skipping the fetch and parse
+        metrics = get_saved_metrics(summary_id)
+        if metrics is None:
+            # Get the summary from the database
+            summary = self.get_summary_metrics(summary_id)
+            if not summary:
+                logger.warning("No summary found with ID %s", summary_id)
+                return None
+                
+            # Extract the metrics_json field
+            metrics_json = summary.get('metrics_json')
+            if not metrics_json:
+                logger.warning("No metrics data in summary %s", summary_id)
+                return None
+            summary_id = summary['id']
             
         try:
-            metrics = json.loads(metrics_json)
-            metrics['summary_id'] = summary['id']
+            if metrics is None:
+                metrics = loads_metrics(metrics_json)
+            metrics['summary_id'] = summary_id
             
             # Evaluate the summary
             evaluation = self.evaluate_summary(metrics)
@@ -217,12 +363,56 @@ class TaskEvaluator:
                 return evaluation
                 
         except json.JSONDecodeError as e:
-            print(f"EVALUATOR: Error parsing metrics JSON: {e}")
+            logger.error("Error parsing metrics JSON: %s", e)
             return None
         except Exception as e:
-            print(f"EVALUATOR: Error evaluating summary: {e}")
+            logger.error("Error evaluating summary: %s", e)
             return None
     
+    def evaluate_summaries_by_ids(self, summary_ids, max_concurrency=MAX_CONCURRENT_EVALUATIONS):
+        """
+        Evaluate several summaries by ID, overlapping their database round-trips
+        
+        Each summary's fetch and save run in a worker thread; at most max_concurrency
+        are in flight at once. The decision logic itself stays synchronous.
+        
+        Args:
+            summary_ids: IDs of the summaries to evaluate
+            max_concurrency: Maximum number of summaries evaluated at the same time
+            
+        Returns:
+            list: The evaluation results, in the order of summary_ids, skipping failures
+        """
+        if not summary_ids:
+            return []
+        
+        evaluations = run_concurrently([lambda summary_id=summary_id: self.evaluate_summary_by_id(summary_id)
+                                        for summary_id in summary_ids],
+                                       max_workers=max_concurrency)
+        return [evaluation for evaluation in evaluations if evaluation]
+    
+    def get_unevaluated_summaries(self):
+        """
+        Get all summaries that have no evaluation yet
+        
+        Reads the v_unevaluated_summaries view (definition in the readme) a page at a
+        time, ordered by ID and continuing after the last ID seen.
+        
+        Returns:
+            list: Records with id, task_id and metrics_json
+        """
+        rows = []
+        last_id = None
+        while True:
+            query = self.supabase.table(UNEVALUATED_VIEW).select('id,task_id,metrics_json')
+            if last_id is not None:
+                query = query.gt('id', last_id)
+            page = query.order('id').limit(UNEVALUATED_PAGE_SIZE).execute().data or []
+            rows.extend(page)
+            if len(page) < UNEVALUATED_PAGE_SIZE:
+                return rows
+            last_id = page[-1]['id']
+    
     def find_and_evaluate_summaries(self):
         """
         Find summaries that need evaluation and evaluate them
@@ -231,39 +421,41 @@ class TaskEvaluator:
             list: List of evaluation results
         """
         if not self.supabase:
-            print("EVALUATOR: No database connection available")
+            logger.warning("No database connection available")
             return []
             
         try:
-            # Find summaries without evaluations
-            # This query finds summaries that don't have corresponding entries in task_evaluations
-            query = """
-            SELECT s.id, s.task_id, s.metrics_json
-            FROM task_summaries s
-            LEFT JOIN task_evaluations e ON s.id = e.summary_id
-            WHERE e.id IS NULL
-            """
-            
-            result = self.supabase.rpc('find_unevaluated_summaries').execute()
+            # Find summaries without evaluations, with their metrics inline
+            summary_records = self.get_unevaluated_summaries()
             
-            if not result.data:
-                print("EVALUATOR: No unevaluated summaries found")
+            if not summary_records:
+                logger.info("No unevaluated summaries found")
                 return []
                 
-            print(f"EVALUATOR: Found {len(result.data)} unevaluated summaries")
+            logger.info("Found %d unevaluated summaries", len(summary_records))
             
-            # Evaluate each summary
-            evaluations = []
-            for summary_record in result.data:
+            # Decode the metrics of each summary
+            summaries = []
+            for summary_record in summary_records:
                 summary_id = summary_record['id']
-                evaluation = self.evaluate_summary_by_id(summary_id)
-                if evaluation:
-                    evaluations.append(evaluation)
+                metrics = get_saved_metrics(summary_id)
+                if metrics is None:
+                    metrics_json = summary_record.get('metrics_json')
+                    if not metrics_json:
+                        logger.warning("No metrics data in summary %s", summary_id)
+                        continue
+                    try:
+                        metrics = loads_metrics(metrics_json)
+                    except json.JSONDecodeError as e:
+                        logger.error("Error parsing metrics JSON for summary %s: %s", summary_id, e)
+                        continue
+                metrics['summary_id'] = summary_id
+                summaries.append(metrics)
             
-            return evaluations
+            return self.evaluate_summaries(summaries)
                 
         except Exception as e:
-            print(f"EVALUATOR: Error finding unevaluated summaries: {e}")
+            logger.error("Error finding unevaluated summaries: %s", e)
             return []
         
 
@@ -272,28 +464,44 @@ if __name__ == '__main__':
     import argparse
     
     parser = argparse.ArgumentParser(description='Evaluate task performance summaries')
-    parser.add_argument('--summary-id', help='ID of summary to evaluate')
+    parser.add_argument('--summary-id', nargs='+', help='ID(s) of summaries to evaluate')
     parser.add_argument('--summary-file', help='Path to JSON file with summary')
     parser.add_argument('--find-unevaluated', action='store_true', help='Find and evaluate all unevaluated summaries')
     parser.add_argument('--output-file', help='Output file for evaluation results')
     args = parser.parse_args()
     
+    try:
+        import orjson
+    except ImportError:  # orjson is optional; fall back to the standard library
+        orjson = None
+    
+    def load_json_file(path):
+        """Read and decode a JSON file"""
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read()) if orjson is not None else json.load(f)
+    
+    def dump_evaluations(evaluations):
+        """Serialize evaluations to indented JSON bytes"""
+        if orjson is not None:
+            return orjson.dumps(evaluations, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+        return json.dumps(evaluations, indent=2).encode()
+    
+    logging.basicConfig(level=logging.DEBUG, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+    
     evaluator = TaskEvaluator()
     
     evaluations = []
     
     if args.summary_id:
-        evaluation = evaluator.evaluate_summary_by_id(args.summary_id)
-        if evaluation:
-            evaluations.append(evaluation)
-            print(f"Evaluation completed for summary {args.summary_id}")
+        evaluations = evaluator.evaluate_summaries_by_ids(args.summary_id)
+        for evaluation in evaluations:
+            print(f"Evaluation completed for summary {evaluation['summary_id']}")
             print(f"Decision: {evaluation['decision']['action']} ({evaluation['decision']['confidence']})")
             print(f"Explanation: {evaluation['decision']['explanation']}")
             print(f"Recommendation: {evaluation['decision']['recommendation']}")
     
     elif args.summary_file and os.path.exists(args.summary_file):
-        with open(args.summary_file) as f:
-            summary = json.load(f)
+        summary = load_json_file(args.summary_file)
             
         evaluation = evaluator.evaluate_summary(summary)
         if evaluation:
@@ -310,8 +518,8 @@ if __name__ == '__main__':
     
     # Save evaluations to file if requested
     if evaluations and args.output_file:
-        with open(args.output_file, 'w') as f:
-            json.dump(evaluations, f, indent=2)
+        with open(args.output_file, 'wb') as f:
+            f.write(dump_evaluations(evaluations))
         print(f"Saved evaluations to {args.output_file}")
     
     if not (args.summary_id or args.summary_file or args.find_unevaluated):
@@ -2,10 +2,17 @@
 import sys
 import os
 import json
+import logging
+from collections import Counter
 from datetime import datetime
-from pathlib import Path
 import argparse
-from dotenv import load_dotenv
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; summaries are then written with the standard library
+    orjson = None
+
+logger = logging.getLogger("task_summary")
 
 # Add project root to path
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -13,13 +20,22 @@ src_dir = os.path.abspath(os.path.join(current_dir, "../../../"))
 if src_dir not in sys.path:
     sys.path.insert(0, src_dir)
 
-# Load environment
-load_dotenv(Path(__file__).resolve().parents[3] / ".env.local")
+# Write buffer for summary output files
+OUTPUT_BUFFER_SIZE = 32768
 
-# Import the modular components
-from src.agents.maintenance.tracker.task_summary.summary_data import SummaryDataCollector
-from src.agents.maintenance.tracker.task_summary.summary_analyzer import SummaryAnalyzer
-from src.agents.maintenance.tracker.task_summary.summary_writer import SummaryWriter
+def dump_summary(summary):
+    """
+    Serialize a summary to indented JSON bytes
+    
+    Args:
+        summary: Performance summary (PerformanceSummary or dict)
+        
+    Returns:
+        bytes: UTF-8 encoded JSON
+    """
+    if orjson is not None:
+        return orjson.dumps(dict(summary), option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(summary, indent=2, default=dict).encode()
 
 class TaskSummary:
     """
@@ -28,12 +44,18 @@ class TaskSummary:
     """
     def __init__(self):
         self.today = datetime.now().date()
-        print(f"SUMMARY: Running for {self.today}")
+        logger.debug("Running for %s", self.today)
+        
+        # Import the modular components here rather than at module level, so the CLI's
+        # --help and argument errors do not wait on numpy/scipy and the database client
+        from src.agents.maintenance.tracker.task_summary.summary_data import SummaryDataCollector
+        from src.agents.maintenance.tracker.task_summary.summary_analyzer import SummaryAnalyzer
+        from src.agents.maintenance.tracker.task_summary.summary_writer import SummaryWriter
         
         # Initialize components
         self.data_collector = SummaryDataCollector()
         self.analyzer = SummaryAnalyzer()
-        self.writer = SummaryWriter()
+        self.writer = SummaryWriter(supabase=self.data_collector.supabase)
     
     def summarize_task(self, task_id):
         """
@@ -45,12 +67,25 @@ class TaskSummary:
         Returns:
             dict: Comprehensive summary with metrics and trend analysis
         """
-        print(f"SUMMARY: Summarizing task ID {task_id}")
+        logger.debug("Summarizing task ID %s", task_id)
         
         # Step 1: Collect task data
         task_data = self.data_collector.collect_data_for_task(task_id)
+        return self.summarize_task_data(task_id, task_data)
+    
+    def summarize_task_data(self, task_id, task_data):
+        """
+        Generate a performance summary for a task from already collected data
+        
+        Args:
+            task_id: ID of the task to summarize
+            task_data: Dictionary with task and measurements data, or None
+            
+        Returns:
+            dict: Comprehensive summary with metrics and trend analysis
+        """
         if not task_data:
-            print(f"SUMMARY: Could not collect data for task {task_id}")
+            logger.warning("Could not collect data for task %s", task_id)
             return None
         
         # Step 2: Analyze the data
@@ -63,52 +98,92 @@ class TaskSummary:
         if saved_summary and 'id' in saved_summary:
             summary['summary_id'] = saved_summary['id']
         
-        print(f"SUMMARY: Completed summary for task ID {task_id}")
+        self.log_completed(task_id, summary)
+        return summary
+    
+    def log_completed(self, task_id, summary):
+        """
+        Log the outcome of a completed summary
+        
+        Args:
+            task_id: ID of the summarized task
+            summary: The performance summary
+        """
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+        logger.debug("Completed summary for task ID %s", task_id)
         if summary.get('status') != 'insufficient_data':
             improvement = summary.get('overall_metrics', {}).get('improvement_pct', 0)
             trend = summary.get('trend_analysis', {}).get('trend_description', 'unknown')
-            print(f"SUMMARY: Improvement: {improvement:.2f}%, Trend: {trend}")
-        
-        return summary
+            logger.debug("Improvement: %.2f%%, Trend: %s", improvement, trend)
     
-    def process_tasks(self, tasks):
+    def process_tasks(self, tasks, output_stream=None):
         """
         Generate summaries for multiple tasks
         
         Args:
             tasks: List of tasks to summarize
+            output_stream: Optional binary stream; the summaries are written to it as a
+                JSON array one at a time, instead of serializing the whole list at once
             
         Returns:
             list: Performance summaries for each task
         """
         if not tasks:
-            print("SUMMARY: No tasks to summarize")
+            logger.info("No tasks to summarize")
+            if output_stream is not None:
+                output_stream.write(b'[]\n')
             return []
         
-        print(f"SUMMARY: Processing {len(tasks)} tasks for summary")
+        logger.info("Processing %d tasks for summary", len(tasks))
         
-        results = []
+        # Collect the data for all tasks up front instead of two queries per task
+        task_data_by_id = self.data_collector.collect_data_for_tasks([task.get('id') for task in tasks])
+        
+        # Analyze each task in memory
+        analyzed = []
         for task in tasks:
-            # Generate summary for this task
             task_id = task.get('id')
-            summary = self.summarize_task(task_id)
+            logger.debug("Summarizing task ID %s", task_id)
+            task_data = task_data_by_id.get(task_id)
+            if not task_data:
+                logger.warning("Could not collect data for task %s", task_id)
+                continue
+            summary = self.analyzer.analyze_task_data(task_data)
             if summary:
-                results.append(summary)
+                analyzed.append((summary, task_data['task']))
         
-        # Print summary
-        completed = len([r for r in results if r.get('status') == 'summarized'])
-        insufficient = len([r for r in results if r.get('status') == 'insufficient_data'])
+        # Save all summaries with one insert
+        self.writer.save_summaries(analyzed)
+        
+        results = []
+        if output_stream is not None:
+            output_stream.write(b'[')
+        for summary, task in analyzed:
+            self.log_completed(task.get('id'), summary)
+            if output_stream is not None:
+                output_stream.write(b',\n' if results else b'\n')
+                output_stream.write(dump_summary(summary))
+            results.append(summary)
+        if output_stream is not None:
+            output_stream.write(b'\n]\n')
         
-        print("\nSUMMARY: Summary Results:")
-        print(f"- Tasks with complete summaries: {completed}")
-        print(f"- Tasks with insufficient data: {insufficient}")
+        # Log summary
+        status_counts = Counter(r.get('status') for r in results)
+        completed = status_counts['summarized']
+        insufficient = status_counts['insufficient_data']
+        logger.info("Summary results: %d tasks with complete summaries, %d with insufficient data",
+                    completed, insufficient)
         
         return results
     
-    def find_and_process_evaluation_tasks(self):
+    def find_and_process_evaluation_tasks(self, output_stream=None):
         """
         Find tasks that are ready for evaluation and process them
         
+        Args:
+            output_stream: Optional binary stream to write the summaries to (see process_tasks)
+            
         Returns:
             list: Performance summaries for the evaluation-ready tasks
         """
@@ -116,13 +191,15 @@ class TaskSummary:
         evaluation_tasks = self.data_collector.get_tasks_for_evaluation()
         
         if not evaluation_tasks:
-            print("SUMMARY: No tasks ready for evaluation")
+            logger.info("No tasks ready for evaluation")
+            if output_stream is not None:
+                output_stream.write(b'[]\n')
             return []
         
-        print(f"SUMMARY: Found {len(evaluation_tasks)} tasks ready for evaluation")
+        logger.info("Found %d tasks ready for evaluation", len(evaluation_tasks))
         
         # Process the tasks
-        return self.process_tasks(evaluation_tasks)
+        return self.process_tasks(evaluation_tasks, output_stream)
 
 
 # For testing this module directly
@@ -135,45 +212,48 @@ if __name__ == '__main__':
     parser.add_argument('--output-file', help='Output file for summaries (default: task_summaries_YYYYMMDD.json)')
     args = parser.parse_args()
     
+    logging.basicConfig(level=logging.DEBUG, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+    
     # Create summarizer
     summarizer = TaskSummary()
     
     # Process from file
     if args.task_file and os.path.exists(args.task_file):
-        with open(args.task_file) as f:
-            tasks = json.load(f)
-        summaries = summarizer.process_tasks(tasks)
+        with open(args.task_file, 'rb') as f:
+            tasks = orjson.loads(f.read()) if orjson is not None else json.load(f)
         
-        # Save summaries to file
+        # Stream the summaries to file as they are produced
+        output_file = args.output_file or f"task_summaries_{datetime.now().strftime('%Y%m%d')}.json"
+        with open(output_file, 'wb', buffering=OUTPUT_BUFFER_SIZE) as f:
+            summaries = summarizer.process_tasks(tasks, output_stream=f)
         if summaries:
-            output_file = args.output_file or f"task_summaries_{datetime.now().strftime('%Y%m%d')}.json"
-            with open(output_file, 'w') as f:
-                json.dump(summaries, f, indent=2)
             print(f"Saved summaries to {output_file}")
+        else:
+            os.remove(output_file)
     
     # Process specific task
     elif args.task_id:
         summary = summarizer.summarize_task(args.task_id)
         if summary:
             print("\nTask Summary:")
-            print(json.dumps(summary, indent=2))
+            print(dump_summary(summary).decode())
             
             # Save single task summary if output file specified
             if args.output_file:
-                with open(args.output_file, 'w') as f:
-                    json.dump(summary, f, indent=2)
+                with open(args.output_file, 'wb') as f:
+                    f.write(dump_summary(summary))
                 print(f"Saved summary to {args.output_file}")
     
     # Find and process tasks ready for evaluation
     elif args.find_ready:
-        summaries = summarizer.find_and_process_evaluation_tasks()
-        
-        # Save summaries to file
+        # Stream the summaries to file as they are produced
+        output_file = args.output_file or f"task_summaries_{datetime.now().strftime('%Y%m%d')}.json"
+        with open(output_file, 'wb', buffering=OUTPUT_BUFFER_SIZE) as f:
+            summaries = summarizer.find_and_process_evaluation_tasks(output_stream=f)
         if summaries:
-            output_file = args.output_file or f"task_summaries_{datetime.now().strftime('%Y%m%d')}.json"
-            with open(output_file, 'w') as f:
-                json.dump(summaries, f, indent=2)
             print(f"Saved summaries to {output_file}")
+        else:
+            os.remove(output_file)
     
     else:
         print("This script generates performance summaries for tasks at the end of their monitoring period.")
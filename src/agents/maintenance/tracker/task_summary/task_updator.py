@@ -2,9 +2,12 @@
 import sys
 import os
 import json
+import logging
+from collections import Counter
 from datetime import datetime, timedelta
 from pathlib import Path
-from dotenv import load_dotenv
+
+logger = logging.getLogger("task_updator")
 
 # Add project root to path
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -12,30 +15,60 @@ src_dir = os.path.abspath(os.path.join(current_dir, "../../../"))
 if src_dir not in sys.path:
     sys.path.insert(0, src_dir)
 
-# Load environment
-load_dotenv(Path(__file__).resolve().parents[3] / ".env.local")
-
-from shared_services.db_client import get_connection
+from shared_services.bootstrap import ensure_env_loaded
+from shared_services.concurrency import run_concurrently
 from summary_writer import SummaryWriter
+from src.agents.maintenance.tracker.task_summary.summary_data import SummaryDataCollector
+
+def _get_connection():
+    """Load the environment on first database use, then return the shared database client"""
+    ensure_env_loaded(Path(__file__).resolve().parents[3] / ".env.local")
+    from shared_services.db_client import get_connection
+    return get_connection()
+
+# Cap on tasks updated concurrently, to avoid overwhelming PostgREST
+MAX_CONCURRENT_UPDATES = 16
+
+# Database function that applies an evaluation in one transaction, created by
+# supabase/migrations/20261017000100_process_evaluation.sql
+PROCESS_EVALUATION_FUNCTION = 'process_evaluation'
+# PostgREST error code for a function missing from its schema cache (not deployed)
+FUNCTION_NOT_FOUND = 'PGRST202'
+
+# Task monitor_status set by the review and intervene decisions
+_DECISION_STATUS = {'review': 'needs_review', 'intervene': 'needs_intervention'}
 
 class TaskUpdater:
     """
     Updates task status in the database based on evaluation decisions.
     Handles task extensions, closures, and status changes.
     """
-    def __init__(self):
+    # Monitoring extension applied when no length is given
+    _DEFAULT_EXTENSION = timedelta(days=14)
+    
+    def __init__(self, supabase=None):
+        """
+        Args:
+            supabase: Existing database client to share; a connection is obtained
+                when omitted
+        """
         self.today = datetime.now().date()
-        print(f"UPDATER: Initializing for {self.today}")
+        logger.debug("Initializing for %s", self.today)
+        
+        # Task rows already read or written by this updater, keyed by task ID
+        self._task_cache = {}
+        # Cleared when the process_evaluation function turns out not to be deployed
+        self._use_process_function = True
         
         try:
             # Connect to the database
-            self.supabase = get_connection()
-            print("UPDATER: Connected to Supabase")
+            self.supabase = supabase if supabase is not None else _get_connection()
+            logger.debug("Connected to Supabase")
             
-            # Initialize summary writer for updating summaries
-            self.summary_writer = SummaryWriter()
+            # Initialize summary writer for updating summaries, on the same client
+            self.summary_writer = SummaryWriter(supabase=self.supabase)
         except Exception as e:
-            print(f"UPDATER: Error initializing: {e}")
+            logger.error("Error initializing: %s", e)
             self.supabase = None
             self.summary_writer = None
     
@@ -49,49 +82,70 @@ class TaskUpdater:
         Returns:
             dict: Task details or None if not found
         """
+        if task_id in self._task_cache:
+            return self._task_cache[task_id]
+            
         if not self.supabase:
-            print("UPDATER: No database connection available")
+            logger.warning("No database connection available")
             return None
             
         try:
             result = self.supabase.table('tasks').select('*').eq('id', task_id).execute()
             
             if result.data:
+                self._task_cache[task_id] = result.data[0]
                 return result.data[0]
             else:
-                print(f"UPDATER: No task found with ID {task_id}")
+                logger.warning("No task found with ID %s", task_id)
                 return None
         except Exception as e:
-            print(f"UPDATER: Error retrieving task: {e}")
+            logger.error("Error retrieving task: %s", e)
             return None
     
-    def get_evaluation(self, evaluation_id):
+    def _task_written(self, task_id, task):
+        """
+        Record a task row returned by a write and drop the summary collector's cached
+        task rows and evaluation lists, which no longer match the database
+        
+        Args:
+            task_id: ID of the task that was written
+            task: Updated task row, or None if the write did not return it
+        """
+        if task:
+            self._task_cache[task_id] = task
+        else:
+            self._task_cache.pop(task_id, None)
+        SummaryDataCollector.clear_cache()
+    
+    def get_evaluation(self, evaluation_id, with_task=False):
         """
         Get evaluation details from the database
         
         Args:
             evaluation_id: ID of the evaluation to retrieve
+            with_task: Also embed the evaluated task row under 'task', in the same query
             
         Returns:
             dict: Evaluation details or None if not found
         """
         if not self.supabase:
-            print("UPDATER: No database connection available")
+            logger.warning("No database connection available")
             return None
             
         try:
-            result = self.supabase.table('task_evaluations').select('*').eq('id', evaluation_id).execute()
+            columns = '*, task:tasks(*)' if with_task else '*'
+            result = self.supabase.table('task_evaluations').select(columns).eq('id', evaluation_id).execute()
             
             if result.data:
                 return result.data[0]
             else:
-                print(f"UPDATER: No evaluation found with ID {evaluation_id}")
+                logger.warning("No evaluation found with ID %s", evaluation_id)
                 return None
         except Exception as e:
-            print(f"UPDATER: Error retrieving evaluation: {e}")
+            logger.error("Error retrieving evaluation: %s", e)
             return None
     
-    def extend_task(self, task_id, original_end_date, reason, extension_days=14):
+    def extend_task(self, task_id, original_end_date, reason, extension_days=None, task=None, now_iso=None):
         """
         Extend a task for continued monitoring
         
@@ -100,23 +154,27 @@ class TaskUpdater:
             original_end_date: Current end date of the task
             reason: Reason for the extension
             extension_days: Number of days to extend (default: 14)
+            task: Task row if already fetched; read from the database when omitted
+            now_iso: Timestamp to record, so a batch shares one; current time when omitted
             
         Returns:
             dict: Updated task or None if failed
         """
         if not self.supabase:
-            print("UPDATER: No database connection available")
+            logger.warning("No database connection available")
             return None
             
         try:
             # Get current task details
-            task = self.get_task_details(task_id)
+            if task is None:
+                task = self.get_task_details(task_id)
             if not task:
                 return None
                 
             # Calculate the new end date
             original_date = datetime.fromisoformat(original_end_date)
-            new_end_date = original_date + timedelta(days=extension_days)
+            extension = self._DEFAULT_EXTENSION if extension_days is None else timedelta(days=extension_days)
+            new_end_date = original_date + extension
             
             # Get the current extension count
             extension_count = task.get('extension_count', 0)
@@ -127,13 +185,13 @@ class TaskUpdater:
                 'monitor_end_date': new_end_date.isoformat(),
                 'monitor_status': 'extended',
                 'extension_count': new_extension_count,
-                'updated_at': datetime.now().isoformat()
+                'updated_at': now_iso or datetime.now().isoformat()
             }
             
             update_result = self.supabase.table('tasks').update(update_data).eq('id', task_id).execute()
             
             if not update_result.data:
-                print(f"UPDATER: Failed to update task {task_id}")
+                logger.warning("Failed to update task %s", task_id)
                 return None
                 
             # Record the extension in the extensions table
@@ -145,60 +203,89 @@ class TaskUpdater:
                 'extension_number': new_extension_count
             }
             
-            extension_result = self.supabase.table('task_extensions').insert(extension_data).execute()
+            self.save_extensions([extension_data])
             
             # If the task has a summary, mark it as non-final
             if 'summary_id' in task:
                 self.summary_writer.update_summary_status(task['summary_id'], False)
             
-            print(f"UPDATER: Extended task {task_id} to {new_end_date.isoformat()}")
-            print(f"UPDATER: New extension count: {new_extension_count}")
+            self._task_written(task_id, update_result.data[0])
+            
+            logger.debug("Extended task %s to %s", task_id, new_end_date.isoformat())
+            logger.debug("New extension count: %s", new_extension_count)
             
             return update_result.data[0]
             
         except Exception as e:
-            print(f"UPDATER: Error extending task: {e}")
+            logger.error("Error extending task: %s", e)
             return None
     
-    def close_task(self, task_id, reason):
+    def save_extensions(self, extensions):
+        """
+        Record several task extensions with a single insert
+        
+        Args:
+            extensions: task_extensions rows built by extend_task
+            
+        Returns:
+            bool: True if the insert succeeded (or there was nothing to record)
+        """
+        if not extensions:
+            return True
+        
+        if not self.supabase:
+            logger.warning("No database connection available")
+            return False
+        
+        try:
+            self.supabase.table('task_extensions').insert(list(extensions)).execute()
+            return True
+        except Exception as e:
+            logger.error("Error recording task extensions: %s", e)
+            return False
+    
+    def close_task(self, task_id, reason, now_iso=None):
         """
         Close a task (mark as completed)
         
         Args:
             task_id: ID of the task to close
             reason: Reason for closure
+            now_iso: Timestamp to record, so a batch shares one; current time when omitted
             
         Returns:
             dict: Updated task or None if failed
         """
         if not self.supabase:
-            print("UPDATER: No database connection available")
+            logger.warning("No database connection available")
             return None
             
         try:
             # Update the task
+            now_iso = now_iso or datetime.now().isoformat()
             update_data = {
                 'status': 'completed',
                 'monitor_status': 'completed',
-                'completed_at': datetime.now().isoformat(),
+                'completed_at': now_iso,
                 'completion_notes': reason,
-                'updated_at': datetime.now().isoformat()
+                'updated_at': now_iso
             }
             
             result = self.supabase.table('tasks').update(update_data).eq('id', task_id).execute()
             
             if result.data:
-                print(f"UPDATER: Closed task {task_id}")
+                self._task_written(task_id, result.data[0])
+                logger.debug("Closed task %s", task_id)
                 return result.data[0]
             else:
-                print(f"UPDATER: Failed to close task {task_id}")
+                logger.warning("Failed to close task %s", task_id)
                 return None
                 
         except Exception as e:
-            print(f"UPDATER: Error closing task: {e}")
+            logger.error("Error closing task: %s", e)
             return None
     
-    def update_task_status(self, task_id, status, notes=None):
+    def update_task_status(self, task_id, status, notes=None, now_iso=None):
         """
         Update a task's status
         
@@ -206,19 +293,20 @@ class TaskUpdater:
             task_id: ID of the task to update
             status: New status (needs_review, needs_intervention)
             notes: Optional notes about the status change
+            now_iso: Timestamp to record, so a batch shares one; current time when omitted
             
         Returns:
             dict: Updated task or None if failed
         """
         if not self.supabase:
-            print("UPDATER: No database connection available")
+            logger.warning("No database connection available")
             return None
             
         try:
             # Prepare update data
             update_data = {
                 'monitor_status': status,
-                'updated_at': datetime.now().isoformat()
+                'updated_at': now_iso or datetime.now().isoformat()
             }
             
             if notes:
@@ -228,20 +316,27 @@ class TaskUpdater:
             result = self.supabase.table('tasks').update(update_data).eq('id', task_id).execute()
             
             if result.data:
-                print(f"UPDATER: Updated task {task_id} status to {status}")
+                self._task_written(task_id, result.data[0])
+                logger.debug("Updated task %s status to %s", task_id, status)
                 return result.data[0]
             else:
-                print(f"UPDATER: Failed to update task {task_id}")
+                logger.warning("Failed to update task %s", task_id)
                 return None
                 
         except Exception as e:
-            print(f"UPDATER: Error updating task: {e}")
+            logger.error("Error updating task: %s", e)
             return None
     
     def process_evaluation(self, evaluation_id):
         """
         Process an evaluation and update the task accordingly
         
+        Calls the process_evaluation database function, which reads the evaluation and
+        its task, applies the decision (close, extend, review or intervene), records any
+        extension and marks the evaluation processed, all in one transaction and one
+        round-trip. If the function is not deployed, the same rules are applied with
+        separate requests (_process_evaluation_client_side).
+        
         Args:
             evaluation_id: ID of the evaluation to process
             
@@ -249,58 +344,131 @@ class TaskUpdater:
             dict: Result of the update operation or None if failed
         """
         if not self.supabase:
-            print("UPDATER: No database connection available")
-            return None
-            
-        # Get the evaluation
-        evaluation = self.get_evaluation(evaluation_id)
-        if not evaluation:
+            logger.warning("No database connection available")
             return None
+        
+        processed = None
+        if self._use_process_function:
+            try:
+                result = self.supabase.rpc(PROCESS_EVALUATION_FUNCTION, {'eval_id': evaluation_id}).execute()
+            except Exception as e:
+                if getattr(e, 'code', None) != FUNCTION_NOT_FOUND:
+                    logger.error("Error processing evaluation %s: %s", evaluation_id, e)
+                    return None
+                logger.warning("Database function %s is not deployed; applying evaluations with separate "
+                               "requests. Apply supabase/migrations/20261017000100_process_evaluation.sql",
+                               PROCESS_EVALUATION_FUNCTION)
+                self._use_process_function = False
+            else:
+                if not result.data:
+                    logger.warning("No evaluation or task found for evaluation %s", evaluation_id)
+                    return None
+                processed = result.data[0]
+                self._task_written(processed['task_id'], processed.pop('task', None))
+        
+        if processed is None:
+            processed = self._process_evaluation_client_side(evaluation_id)
+            if processed is None:
+                return None
+        
+        if processed['status'] == 'processed':
+            logger.debug("Applied '%s' to task %s", processed['action'], processed['task_id'])
+        else:
+            logger.warning("Failed to apply '%s' to task %s", processed['action'], processed['task_id'])
+        
+        return processed
+    
+    def _process_evaluation_client_side(self, evaluation_id):
+        """
+        Apply an evaluation with separate requests, for databases without the
+        process_evaluation function; follows the same rules as the function, but the
+        task update and the processed_at mark are not one transaction
+        
+        Args:
+            evaluation_id: ID of the evaluation to process
             
-        # Get the task
-        task_id = evaluation['task_id']
-        task = self.get_task_details(task_id)
+        Returns:
+            dict: Result of the update operation or None if the evaluation or its task
+                  was not found
+        """
+        evaluation = self.get_evaluation(evaluation_id, with_task=True)
+        task = evaluation.get('task') if evaluation else None
         if not task:
+            logger.warning("No evaluation or task found for evaluation %s", evaluation_id)
             return None
-            
-        # Get the decision
+        
+        task_id = evaluation['task_id']
         decision = evaluation['decision']
         explanation = evaluation['explanation']
+        now_iso = datetime.now().isoformat()
         
-        # Process based on decision
-        result = None
         if decision == 'close':
-            result = self.close_task(task_id, explanation)
+            updated = self.close_task(task_id, explanation, now_iso)
         elif decision == 'extend':
-            result = self.extend_task(
-                task_id=task_id,
-                original_end_date=task['monitor_end_date'],
-                reason=explanation
-            )
-        elif decision == 'review':
-            result = self.update_task_status(task_id, 'needs_review', explanation)
-        elif decision == 'intervene':
-            result = self.update_task_status(task_id, 'needs_intervention', explanation)
+            updated = self.extend_task(task_id, task['monitor_end_date'], explanation, task=task, now_iso=now_iso)
+        elif decision in _DECISION_STATUS:
+            updated = self.update_task_status(task_id, _DECISION_STATUS[decision], explanation, now_iso)
+        else:
+            updated = None
         
-        if result:
-            # Mark this evaluation as processed
-            self.supabase.table('task_evaluations').update({
-                'processed_at': datetime.now().isoformat()
-            }).eq('id', evaluation_id).execute()
+        status = 'failed'
+        if updated:
+            try:
+                self.supabase.table('task_evaluations').update({'processed_at': now_iso}).eq('id', evaluation_id).execute()
+                status = 'processed'
+            except Exception as e:
+                logger.error("Error marking evaluation %s processed: %s", evaluation_id, e)
+        
+        return {
+            'task_id': task_id,
+            'evaluation_id': evaluation_id,
+            'action': decision,
+            'status': status
+        }
+    
+    def process_evaluations(self, evaluations, max_concurrency=MAX_CONCURRENT_UPDATES):
+        """
+        Process several evaluations concurrently
+        
+        Evaluations of the same task run in order in one worker thread, so a task is
+        never updated by two evaluations at once; different tasks run in parallel, at
+        most max_concurrency at a time.
+        
+        Args:
+            evaluations: Evaluation records with id and task_id
+            max_concurrency: Maximum number of tasks processed at the same time
             
-            return {
-                'task_id': task_id,
-                'evaluation_id': evaluation_id,
-                'action': decision,
-                'status': 'processed'
-            }
-        else:
-            return {
-                'task_id': task_id,
-                'evaluation_id': evaluation_id,
-                'action': decision,
-                'status': 'failed'
-            }
+        Returns:
+            list: Results of processing each evaluation, in input order
+        """
+        # Group evaluation IDs by task, keeping their order
+        evaluation_ids_by_task = {}
+        for evaluation in evaluations:
+            evaluation_ids_by_task.setdefault(evaluation['task_id'], []).append(evaluation['id'])
+        
+        def process_task_evaluations(evaluation_ids):
+            try:
+                return [(evaluation_id, self.process_evaluation(evaluation_id)) for evaluation_id in evaluation_ids]
+            except Exception as e:
+                # Reported per task below, so one failing task does not stop the others
+                return e
+        
+        if not evaluation_ids_by_task:
+            return []
+        
+        all_results = run_concurrently([lambda evaluation_ids=evaluation_ids: process_task_evaluations(evaluation_ids)
+                                        for evaluation_ids in evaluation_ids_by_task.values()],
+                                       max_workers=max_concurrency)
+        
+        result_by_id = {}
+        for task_id, group_results in zip(evaluation_ids_by_task, all_results):
+            if isinstance(group_results, Exception):
+                logger.error("Error processing evaluations for task %s: %s", task_id, group_results)
+                continue
+            result_by_id.update(group_results)
+        
+        return [result_by_id[evaluation['id']] for evaluation in evaluations
+                if result_by_id.get(evaluation['id'])]
     
     def find_and_process_evaluations(self):
         """
@@ -310,7 +478,7 @@ class TaskUpdater:
             list: Results of processing each evaluation
         """
         if not self.supabase:
-            print("UPDATER: No database connection available")
+            logger.warning("No database connection available")
             return []
             
         try:
@@ -318,27 +486,24 @@ class TaskUpdater:
             result = self.supabase.table('task_evaluations').select('*').is_('processed_at', 'null').execute()
             
             if not result.data:
-                print("UPDATER: No unprocessed evaluations found")
+                logger.info("No unprocessed evaluations found")
                 return []
                 
-            print(f"UPDATER: Found {len(result.data)} unprocessed evaluations")
+            logger.info("Found %d unprocessed evaluations", len(result.data))
             
-            # Process each evaluation
-            results = []
-            for evaluation in result.data:
-                process_result = self.process_evaluation(evaluation['id'])
-                if process_result:
-                    results.append(process_result)
+            # Process the evaluations, overlapping the round-trips of different tasks
+            results = self.process_evaluations(result.data)
             
-            # Print summary
-            processed = len([r for r in results if r['status'] == 'processed'])
-            failed = len([r for r in results if r['status'] == 'failed'])
-            print(f"UPDATER: Processed {processed} evaluations, {failed} failed")
+            # Log summary
+            status_counts = Counter(r['status'] for r in results)
+            processed = status_counts['processed']
+            failed = status_counts['failed']
+            logger.info("Processed %d evaluations, %d failed", processed, failed)
             
             return results
                 
         except Exception as e:
-            print(f"UPDATER: Error finding unprocessed evaluations: {e}")
+            logger.error("Error finding unprocessed evaluations: %s", e)
             return []
 
 
@@ -353,6 +518,8 @@ if __name__ == '__main__':
     parser.add_argument('--process-all', action='store_true', help='Process all unprocessed evaluations')
     args = parser.parse_args()
     
+    logging.basicConfig(level=logging.DEBUG, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+    
     updater = TaskUpdater()
     
     if args.evaluation_id:
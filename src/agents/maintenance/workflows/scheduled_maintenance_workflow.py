@@ -151,7 +151,7 @@ class ScheduledMaintenanceWorkflow:
             # Generate maintenance schedule
             logger.info("Generating service schedule from cluster results")
             scheduling_results = self.scheduler.generate_service_schedule_from_cluster(
-                cluster_file=self.cluster_output_path,
+                cluster_data=cluster_results,
                 max_tasks=self.max_tasks
             )
             
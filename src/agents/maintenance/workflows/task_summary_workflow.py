@@ -57,9 +57,12 @@ class TaskSummaryWorkflow:
         try:
             self.data_collector = SummaryDataCollector()
             self.analyzer = SummaryAnalyzer()
-            self.writer = SummaryWriter()
-            self.evaluator = TaskEvaluator()
-            self.updater = TaskUpdater()
+            
+            # Share the collector's database client with the other components
+            supabase = self.data_collector.supabase
+            self.writer = SummaryWriter(supabase=supabase)
+            self.evaluator = TaskEvaluator(supabase=supabase)
+            self.updater = TaskUpdater(supabase=supabase)
             self.notification_handler = NotificationHandler()
             
             logger.info("All components initialized successfully")
@@ -82,7 +85,7 @@ class TaskSummaryWorkflow:
         """Save data to output file"""
         filepath = self.output_dir / filename
         with open(filepath, 'w') as f:
-            json.dump(data, f, indent=2)
+            json.dump(data, f, indent=2, default=dict)
         logger.info(f"Saved output to {filepath}")
         return filepath
     
@@ -113,13 +116,21 @@ class TaskSummaryWorkflow:
         logger.info(f"Generating summaries for {len(tasks)} tasks")
         summaries = []
         
+        # Step 1: Collect data for all tasks with one tasks and one measurements query
+        try:
+            task_data_by_id = self.data_collector.collect_data_for_tasks([task['id'] for task in tasks])
+        except Exception as e:
+            error_msg = f"Error collecting task data: {str(e)}"
+            logger.error(error_msg, exc_info=True)
+            self.results['errors'].append(error_msg)
+            task_data_by_id = {}
+        
         for task in tasks:
             task_id = task['id']
             logger.info(f"Processing task {task_id}")
             
             try:
-                # Step 1: Collect data for the task
-                task_data = self.data_collector.collect_data_for_task(task_id)
+                task_data = task_data_by_id.get(task_id)
                 if not task_data:
                     logger.warning(f"No data available for task {task_id}")
                     continue
@@ -154,13 +165,15 @@ class TaskSummaryWorkflow:
         logger.info(f"Created {len(summaries)} summaries")
         return summaries
     
-    def evaluate_summaries(self):
+    def evaluate_summaries(self, summaries=None):
         """Evaluate summaries and make decisions"""
         logger.info("Evaluating performance summaries")
         
         try:
-            # Use TaskEvaluator to find and evaluate summaries
-            evaluations = self.evaluator.find_and_evaluate_summaries()
+            # Summaries created in this run are evaluated from memory, then TaskEvaluator
+            # finds any others still without an evaluation (e.g. from an earlier failed run)
+            evaluations = self.evaluator.evaluate_summaries(summaries) if summaries else []
+            evaluations += self.evaluator.find_and_evaluate_summaries()
             self.results['evaluations_made'] = len(evaluations)
             
             if evaluations:
@@ -386,7 +399,7 @@ class TaskSummaryWorkflow:
             summaries = self.generate_summaries(tasks)
             
             # Step 3: Evaluate summaries
-            evaluations = self.evaluate_summaries()
+            evaluations = self.evaluate_summaries(summaries)
             
             # Step 4: Update tasks based on evaluations
             update_results = self.update_tasks()
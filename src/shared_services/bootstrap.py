@@ -0,0 +1,29 @@
+import os
+import threading
+from dotenv import load_dotenv
+
+# Project root .env.local, the file config.settings reads
+DEFAULT_ENV_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..', '.env.local'))
+
+# Env files already loaded by this process
+_loaded = set()
+_loaded_lock = threading.Lock()
+
+def ensure_env_loaded(env_file=DEFAULT_ENV_FILE):
+    """
+    Load an env file into the environment once per process; later calls for the
+    same file return without reading it again
+
+    Args:
+        env_file: Path to the env file (default: the project root .env.local)
+
+    Returns:
+        bool: True if the file was loaded by this call, False if it already was
+    """
+    env_file = os.path.abspath(env_file)
+    with _loaded_lock:
+        if env_file in _loaded:
+            return False
+        load_dotenv(env_file)
+        _loaded.add(env_file)
+        return True
@@ -0,0 +1,27 @@
+from concurrent.futures import ThreadPoolExecutor
+
+def run_concurrently(calls, max_workers=None):
+    """
+    Run independent blocking calls (database round-trips) in worker threads and
+    wait for all of them
+
+    Uses a thread pool rather than asyncio.run, so it is safe to call from plain
+    scripts and from code already running inside an event loop (the FastAPI
+    endpoints, agent workers). Each call gets its own pool, so calls made from
+    inside a worker cannot deadlock waiting on a shared one.
+
+    Args:
+        calls: Functions taking no arguments
+        max_workers: Maximum number of calls running at the same time (default: all)
+
+    Returns:
+        list: The results of calls, in order; the first exception raised by a call
+        is re-raised
+    """
+    calls = list(calls)
+    if not calls:
+        return []
+    if len(calls) == 1:
+        return [calls[0]()]
+    with ThreadPoolExecutor(max_workers=min(max_workers or len(calls), len(calls))) as executor:
+        return list(executor.map(lambda call: call(), calls))
@@ -1,30 +1,53 @@
 import sys
 import os
+import threading
+from functools import lru_cache
 
 # Add the project root to the Python path
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-print(f"Project root: {project_root}")
-print(f"Python path: {sys.path}")
-
+import httpx
 from supabase.client import create_client, Client
 from config.settings import SUPABASE_URL, SUPABASE_KEY
 
-
-
-# Validate environment variables
-if not SUPABASE_URL or not SUPABASE_KEY:
-    raise ValueError("Supabase credentials are not properly configured. Please check your .env.local file.")
-
-# Initialize Supabase client
-supabase: Client = create_client(str(SUPABASE_URL), str(SUPABASE_KEY))
+# Connection pool of the shared PostgREST session. Every collector, evaluator and
+# writer in the process goes through the one client, so idle connections are kept
+# for 30 seconds (httpx default: 5) and reused instead of new TLS handshakes
+HTTP_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=30.0)
+
+# Serialises client creation when the first callers arrive from several threads
+_connection_lock = threading.Lock()
+
+@lru_cache(maxsize=1)
+def _create_client() -> Client:
+    # Validate environment variables
+    if not SUPABASE_URL or not SUPABASE_KEY:
+        raise ValueError("Supabase credentials are not properly configured. Please check your .env.local file.")
+
+    client = create_client(str(SUPABASE_URL), str(SUPABASE_KEY))
+    # Swap the PostgREST session for one with an explicit pool, keeping its URL, headers and timeout
+    session = client.postgrest.session
+    client.postgrest.session = type(session)(
+        base_url=session.base_url,
+        headers=session.headers,
+        timeout=session.timeout,
+        limits=HTTP_LIMITS,
+    )
+    session.close()
+    return client
 
 def get_connection():
-    """Get a connection to the Supabase database"""
-    return supabase
+    """
+    Get the process-wide Supabase client, creating it on first use
+
+    Returns:
+        Client: The shared client; every caller gets the same instance
+    """
+    with _connection_lock:
+        return _create_client()
 
 def release_connection(conn):
-    """Release the connection (no-op for Supabase as it's stateless)"""
-    pass 
\ No newline at end of file
+    """Release the connection (no-op: the client is shared for the life of the process)"""
+    pass
@@ -0,0 +1,15 @@
+-- At most one open scheduled_maintenance task per machine.
+--
+-- MaintenanceScheduler.create_tasks_bulk relies on this index as its only
+-- duplicate guard: an insert for a machine that already has an open task fails
+-- with a unique violation (23505) and the task is skipped. Without it a second
+-- open task is inserted silently.
+--
+-- Creating the index fails if a machine already has more than one open task;
+-- list them with the query below and close the extra tasks first:
+--
+--   SELECT machine_id, count(*) FROM scheduled_maintenance
+--   WHERE status = 'open' GROUP BY machine_id HAVING count(*) > 1;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_sm_one_open_per_machine
+    ON scheduled_maintenance (machine_id) WHERE status = 'open';
@@ -0,0 +1,85 @@
+-- process_evaluation: apply one task evaluation in a single transaction.
+--
+-- Reads the evaluation and its task, applies the decision (close, extend,
+-- review or intervene), records any extension and marks the evaluation
+-- processed. Returns one jsonb row with the outcome, or no rows if the
+-- evaluation or its task does not exist.
+--
+-- Called by TaskUpdater.process_evaluation (task_summary/task_updator.py).
+-- Keep the rules in step with its client-side fallback, which TaskUpdater uses
+-- when this function is not deployed: close_task, extend_task and
+-- update_task_status.
+
+CREATE OR REPLACE FUNCTION process_evaluation(eval_id uuid, extension_days integer DEFAULT 14)
+RETURNS SETOF jsonb
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_eval task_evaluations%ROWTYPE;
+    v_task tasks%ROWTYPE;
+    v_original_end_date tasks.monitor_end_date%TYPE;
+    v_status text := 'failed';
+BEGIN
+    SELECT * INTO v_eval FROM task_evaluations WHERE id = eval_id;
+    IF NOT FOUND THEN
+        RETURN;
+    END IF;
+
+    SELECT * INTO v_task FROM tasks WHERE id = v_eval.task_id FOR UPDATE;
+    IF NOT FOUND THEN
+        RETURN;
+    END IF;
+
+    IF v_eval.decision = 'close' THEN
+        UPDATE tasks
+           SET status = 'completed', monitor_status = 'completed', completed_at = now(),
+               completion_notes = v_eval.explanation, updated_at = now()
+         WHERE id = v_task.id
+        RETURNING * INTO v_task;
+        v_status := 'processed';
+
+    ELSIF v_eval.decision = 'extend' THEN
+        v_original_end_date := v_task.monitor_end_date;
+        UPDATE tasks
+           SET monitor_end_date = v_original_end_date + make_interval(days => extension_days),
+               monitor_status = 'extended',
+               extension_count = COALESCE(v_task.extension_count, 0) + 1,
+               updated_at = now()
+         WHERE id = v_task.id
+        RETURNING * INTO v_task;
+
+        INSERT INTO task_extensions (task_id, original_end_date, new_end_date, reason, extension_number)
+        VALUES (v_task.id, v_original_end_date, v_task.monitor_end_date, v_eval.explanation,
+                v_task.extension_count);
+
+        -- The task's summary is no longer final while monitoring continues
+        IF to_jsonb(v_task) ? 'summary_id' THEN
+            UPDATE task_summaries SET is_final = false
+             WHERE id::text = to_jsonb(v_task) ->> 'summary_id';
+        END IF;
+        v_status := 'processed';
+
+    ELSIF v_eval.decision IN ('review', 'intervene') THEN
+        UPDATE tasks
+           SET monitor_status = CASE v_eval.decision WHEN 'review' THEN 'needs_review'
+                                                     ELSE 'needs_intervention' END,
+               notes = COALESCE(NULLIF(v_eval.explanation, ''), notes),
+               updated_at = now()
+         WHERE id = v_task.id
+        RETURNING * INTO v_task;
+        v_status := 'processed';
+    END IF;
+
+    IF v_status = 'processed' THEN
+        UPDATE task_evaluations SET processed_at = now() WHERE id = eval_id;
+    END IF;
+
+    RETURN NEXT jsonb_build_object(
+        'task_id', v_task.id,
+        'evaluation_id', v_eval.id,
+        'action', v_eval.decision,
+        'status', v_status,
+        'task', to_jsonb(v_task)
+    );
+END;
+$$;